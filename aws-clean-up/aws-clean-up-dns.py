@@ -1,12 +1,16 @@
+import json
 import logging
 import os
 import sys
+import threading
+import time
 from collections import defaultdict
+from functools import partial
 from itertools import chain
 from operator import methodcaller
+from typing import Callable, Iterable
 
 from botocore.exceptions import ClientError
-from tld import get_tld
 
 sys.path.append(os.path.dirname(os.getcwd()))
 
@@ -36,131 +40,352 @@ key_value: str = "Value"
 record_change_action: str = "DELETE"
 record_type: str = "CNAME"
 
+# Fields of an ACM certificate summary (from 'list_certificates', since botocore 1.29.0) which change with its status or
+# on renewal, invalidating its (otherwise immutable) domain validation records in the ACM certificates index
+acm_certificate_meta_keys: list[str] = ["Status", "RenewalEligibility", "NotAfter", "IssuedAt"]
+acm_certificate_detail_keys: list[str] = ["DomainName", "DomainValidationOptions"]
 
-def main(region: str):
+# Route53 limits, per change batch (i.e. per 'change_resource_record_sets' request)
+route53_change_batch_max_changes: int = 1000
+route53_change_batch_max_records: int = 1000  # 'ResourceRecord' elements
+route53_change_batch_max_chars: int = 32000  # Characters, in all 'Value' elements
+
+# Polling (all outstanding) Route53 changes until 'INSYNC', with exponential back-off
+route53_get_change_delay: float = 2  # Seconds
+route53_get_change_max_delay: float = 30  # Seconds
+route53_get_change_timeout: float = 900  # Seconds
+route53_change_status_insync: str = "INSYNC"
+
+
+class ZoneTrie:
+    # Trie of hosted zone names, by reversed domain name labels (e.g. 'eu.example.com.' -> 'com', 'example', 'eu'),
+    # finding the most specific hosted zone of a domain name (by longest suffix match) in O(number of labels), so
+    # domain names in delegated sub-zones resolve to the sub-zone, rather than to the first-level domain
+    def __init__(self, zone_names: Iterable[str] = ()):
+        self.root: dict = {}
+        for zone_name in zone_names:
+            self.insert(zone_name)
+
+    @staticmethod
+    def get_labels(domain_name: str) -> list[str]:
+        return list(reversed(domain_name.rstrip(".").lower().split(sep=".")))
+
+    def insert(self, zone_name: str):
+        node: dict = self.root
+        for label in self.get_labels(zone_name):
+            node = node.setdefault(label, {})
+        node[None] = zone_name  # A 'None' key (never a label) marks the end of a hosted zone name
+
+    def get(self, domain_name: str) -> str:
+        node: dict = self.root
+        zone_name: str = None
+        for label in self.get_labels(domain_name):
+            if (node := node.get(label)) is None:
+                break
+            zone_name = node.get(None, zone_name)
+        return zone_name
+
+
+def add_amplify_app_certificate_record_names(
+    amplify,
+    zone_trie: ZoneTrie,
+    amplify_certificates_meta_map: dict[str, set[str]],
+    lock: threading.Lock,
+    amplify_app_id_name: tuple[str, str],
+):
+    # Add the certificate verification DNS record name of each of the AWS Amplify app's domain associations (across all
+    # pages) to the set of its hosted zone, as each page arrives
+    amplify_app_id, amplify_app_name = amplify_app_id_name
+    for i in cf.paginate(
+        amplify.list_domain_associations,
+        "domainAssociations",
+        f"Amplify List Domain Associations ('{amplify_app_name}')",
+        token_key="nextToken",
+        maxResults=50,  # Max: 50
+        appId=amplify_app_id,
+    ):
+        if (record := i.get("certificateVerificationDNSRecord")) and (zone_name := zone_trie.get(i["domainName"])):
+            with lock:
+                amplify_certificates_meta_map.setdefault(zone_name, set()).add(record.split(sep=" ")[0])
+
+
+def add_amplify_certificates_meta(
+    zone_trie: ZoneTrie, amplify_certificates_meta_map: dict[str, set[str]], lock: threading.Lock, r: str
+):
+    # List the domain associations of each AWS Amplify app (in the AWS region) on a bounded worker pool
+    amplify = cf.get_client(r, aws.amplify_str)
+    _, errors = cf.fan_out(
+        partial(add_amplify_app_certificate_record_names, amplify, zone_trie, amplify_certificates_meta_map, lock),
+        [(i["appId"], i["name"]) for i in cf.amplify_list_apps(amplify)],
+        desc="Amplify List Domain Associations",
+    )
+    if errors:
+        logger.error(
+            f"## ERROR: Could not list domain associations, for AWS Amplify apps: {[i[1] for i in errors]}, "
+            f"AWS region: {r}"
+        )
+        sys.exit(1)
+
+
+def get_route53_resource_record_sets(
+    route53, on_error: Callable, route53_hosted_zone_name_id: tuple[str, str]
+) -> list[dict]:
+    # Filter each page as it arrives, so only the matching ('acm-validations.aws.' CNAME) records of a hosted zone are
+    # held in memory, never all of its records
+    route53_hosted_zone_name, route53_hosted_zone_id = route53_hosted_zone_name_id
+    return [
+        i
+        for i in cf.paginate(
+            route53.list_resource_record_sets,
+            "ResourceRecordSets",
+            f"Route53 List Resource Record Sets ('{route53_hosted_zone_name}')",
+            token_key="StartRecordName",
+            res_token_key="NextRecordName",
+            is_truncated_key="IsTruncated",
+            on_error=on_error,
+            HostedZoneId=route53_hosted_zone_id,
+        )
+        if i[key_type] == record_type
+        and (value := str(i["ResourceRecords"][0][key_value]))
+        and value.endswith(domain_name_aws_valid)
+    ]
+
+
+def get_acm_certificates_index_path(region: str) -> str:
+    return os.path.join(
+        cf.response_cache_dir,
+        f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-certificates-{cf.get_account_id(region)}-{region}.json",
+    )
+
+
+def load_acm_certificates_index(region: str) -> dict[str, dict]:
+    # Certificate ARN -> certificate meta (see 'acm_certificate_meta_keys'), domain name and domain validation options
+    # (as of the last run)
+    if os.path.exists(acm_certificates_index_path := get_acm_certificates_index_path(region)):
+        logger.info(f"## Loaded ACM certificates index from: '{acm_certificates_index_path}'")
+        with open(acm_certificates_index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_acm_certificates_index(region: str, index: dict[str, dict]):
+    cf.make_response_cache_dir()
+    acm_certificates_index_path: str = get_acm_certificates_index_path(region)
+    logger.info(f"## Saving ACM certificates index to: '{acm_certificates_index_path}'")
+    with open(acm_certificates_index_path, "w+", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, default=str)
+
+
+def get_acm_certificate_meta(acm_certificate_summary: dict) -> dict[str, str]:
+    return {k: str(acm_certificate_summary[k]) for k in acm_certificate_meta_keys if k in acm_certificate_summary}
+
+
+def is_acm_certificate_unchanged(acm_certificate_meta: dict[str, str], acm_certificate_index_meta: dict) -> bool:
+    # Only an issued certificate's domain validation records are stable (e.g. a certificate pending validation is always
+    # re-described), which also excludes summaries without a status (from older botocore versions)
+    return (
+        acm_certificate_index_meta is not None
+        and acm_certificate_meta.get("Status") == "ISSUED"
+        and all(acm_certificate_index_meta.get(k) == v for k, v in acm_certificate_meta.items())
+    )
+
+
+def describe_acm_certificate(acm, certificate_arn: str) -> dict:
+    # Returns None if the certificate has since been deleted (e.g. it was listed by a cached response)
+    try:
+        acm_describe_certificate_res = acm.describe_certificate(CertificateArn=certificate_arn)
+    except ClientError as ex:
+        if ex.response["Error"]["Code"] == "ResourceNotFoundException":
+            logger.info(f"## ACM Describe Certificate, certificate not found (skipping): '{certificate_arn}'")
+            return None
+        raise
+    logger.info(f"## ACM Describe Certificate successful response: '{certificate_arn}'")
+    return {k: v for k in acm_certificate_detail_keys if (v := acm_describe_certificate_res["Certificate"].get(k))}
+
+
+def get_route53_change_batches(changes: list[dict]) -> list[list[dict]]:
+    # Split the changes (in order, each change whole) into as few change batches as fit the Route53 limits
+    change_batches: list[list[dict]] = []
+    change_batch: list[dict] = []
+    records: int = 0
+    chars: int = 0
+    for change in changes:
+        resource_records: list[dict] = change["ResourceRecordSet"].get("ResourceRecords", [])
+        change_records: int = max(1, len(resource_records))
+        change_chars: int = sum(len(i[key_value]) for i in resource_records)
+        if change_batch and (
+            len(change_batch) >= route53_change_batch_max_changes
+            or records + change_records > route53_change_batch_max_records
+            or chars + change_chars > route53_change_batch_max_chars
+        ):
+            change_batches.append(change_batch)
+            change_batch, records, chars = [], 0, 0
+        change_batch.append(change)
+        records += change_records
+        chars += change_chars
+    if change_batch:
+        change_batches.append(change_batch)
+    return change_batches
+
+
+def change_route53_resource_record_sets(
+    route53,
+    route53_hosted_zones_name_id: dict[str, str],
+    route53_changes: dict[str, list[dict]],
+    route53_change_res: dict[str, list[dict]],
+    route53_hosted_zone_name: str,
+):
+    # Submit the change batches of a hosted zone one after another (Route53 rejects a change to a hosted zone while a
+    # prior change is still being submitted, with 'PriorRequestNotComplete'), recording each response as it is submitted
+    route53_hosted_zone_id: str = route53_hosted_zones_name_id[route53_hosted_zone_name]
+    change_batches: list[list[dict]] = get_route53_change_batches(route53_changes[route53_hosted_zone_name])
+    for n, changes in enumerate(change_batches, start=1):
+        route53_change_res[route53_hosted_zone_name].append(
+            route53.change_resource_record_sets(
+                HostedZoneId=route53_hosted_zone_id,
+                ChangeBatch={
+                    "Comment": f"Change batch request (from: '{cf.filename}' script) to '{record_change_action}' "
+                    f"({len(changes)}x) '{record_type}' type records (for domain: '{route53_hosted_zone_name}') in "
+                    f"hosted zone: {route53_hosted_zone_id} (change batch: {n}/{len(change_batches)})",
+                    "Changes": changes,
+                },
+            )
+        )
+        logger.info(
+            f"## Route53 Change Resource Record Sets ({record_change_action}) successful response: "
+            f"'{route53_hosted_zone_name}' (change batch: {n}/{len(change_batches)})"
+        )
+
+
+def get_route53_change_status(route53, change_id: str) -> str:
+    return route53.get_change(Id=change_id)["ChangeInfo"]["Status"]
+
+
+def wait_for_route53_changes(route53, change_ids: list[str]) -> tuple[list[str], dict[str, BaseException]]:
+    # Poll all outstanding changes together, backing off (exponentially) between rounds, until all changes are 'INSYNC'
+    # (or the timeout), returning any change IDs still outstanding, and the errors of any change IDs which could not be
+    # polled (each is dropped, rather than polled again, as the AWS API call was already retried by botocore)
+    deadline: float = time.monotonic() + route53_get_change_timeout
+    delay: float = route53_get_change_delay
+    change_ids_errors: dict[str, BaseException] = {}
+    while True:
+        route53_change_statuses, errors = cf.fan_out(
+            partial(get_route53_change_status, route53), change_ids, desc="Route53 Get Change"
+        )
+        change_ids_errors.update(errors)
+        change_ids = [
+            i for i in change_ids if i not in errors and route53_change_statuses.get(i) != route53_change_status_insync
+        ]
+        if not change_ids or time.monotonic() + delay > deadline:
+            return change_ids, change_ids_errors
+        logger.info(f"## Waiting {delay}s for {len(change_ids)} Route53 changes to be '{route53_change_status_insync}'")
+        time.sleep(delay)
+        delay = min(route53_get_change_max_delay, delay * 2)
+
+
+def main(region: str, cache: bool = False, refresh: bool = False, incremental: bool = False):
     cf.info_log_starting()
 
+    if cache or refresh:
+        cf.use_response_cache(refresh=refresh)
+
     acm = cf.get_client(region, aws.acm_str)
 
     clients, res = cf.get_clients_and_res_objs(region, base_steps_client_names)
 
-    is_next_token: bool = True
-    next_token: str = None
-    route53_hosted_zones_meta: list[dict] = []
-    while is_next_token:
-        try:
-            route53_list_hosted_zones_res = clients[aws.route53_str].list_hosted_zones(
-                **{
-                    k: v
-                    for k, v in {
-                        "Marker": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## Route53 List Hosted Zones successful response")
-        except ClientError as ex:
-            logger.error(f"## Route53 List Hosted Zones ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        route53_hosted_zones_meta += route53_list_hosted_zones_res["HostedZones"]
-        if route53_list_hosted_zones_res.get("IsTruncated") and "NextMarker" in route53_list_hosted_zones_res:
-            next_token = route53_list_hosted_zones_res["NextMarker"]
-        else:
-            is_next_token = False
-
-    route53_hosted_zones_name_id: dict[str, str] = {}
-    route53_list_resource_record_sets_map: dict[str, list[dict]] = {}
-    for route53_hosted_zone_meta in route53_hosted_zones_meta:
-        if not route53_hosted_zone_meta["Config"]["PrivateZone"]:
-            route53_hosted_zones_name_id[route53_hosted_zone_meta[key_name]] = route53_hosted_zone_meta["Id"]
-            is_next_token = True
-            next_token = None
-            route53_list_resource_record_sets_list: list[dict] = []
-            while is_next_token:
-                try:
-                    route53_list_resource_record_sets_res = clients[aws.route53_str].list_resource_record_sets(
-                        HostedZoneId=route53_hosted_zones_name_id[route53_hosted_zone_meta[key_name]],
-                        **{
-                            k: v
-                            for k, v in {
-                                "StartRecordName": next_token if next_token else None,
-                            }.items()
-                            if v
-                        },
-                    )
-                    logger.info("## Route53 List Hosted Zones successful response")
-                except ClientError as ex:
-                    logger.error(f"## Route53 List Hosted Zones ERROR: '{ex}'")
-                    cf.write_to_json_paths(res, base_steps_client_names)
-                    sys.exit(1)
-                route53_list_resource_record_sets_list += [
-                    i
-                    for i in route53_list_resource_record_sets_res["ResourceRecordSets"]
-                    if i[key_type] == record_type
-                    and (value := str(i["ResourceRecords"][0][key_value]))
-                    and value.endswith(domain_name_aws_valid)
-                ]
-                if (
-                    route53_list_resource_record_sets_res.get("IsTruncated")
-                    and "NextRecordName" in route53_list_resource_record_sets_res
-                ):
-                    next_token = route53_list_resource_record_sets_res["NextRecordName"]
-                else:
-                    is_next_token = False
-            if route53_list_resource_record_sets_list:
-                route53_list_resource_record_sets_map[route53_hosted_zone_meta[key_name]] = (
-                    route53_list_resource_record_sets_list
-                )
+    route53_hosted_zones_name_id: dict[str, str] = {
+        route53_hosted_zone_meta[key_name]: route53_hosted_zone_meta["Id"]
+        for route53_hosted_zone_meta in cf.paginate(
+            clients[aws.route53_str].list_hosted_zones,
+            "HostedZones",
+            "Route53 List Hosted Zones",
+            token_key="Marker",
+            res_token_key="NextMarker",
+            is_truncated_key="IsTruncated",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+        )
+        if not route53_hosted_zone_meta["Config"]["PrivateZone"]
+    }
+
+    # List the record sets of each (public) hosted zone on a bounded worker pool, paced by the shared (account-wide)
+    # Route53 rate limiter, the results are merged in the same order as the hosted zones, regardless of completion order
+    route53_list_resource_record_sets_res, errors = cf.fan_out(
+        partial(
+            get_route53_resource_record_sets,
+            clients[aws.route53_str],
+            lambda: cf.write_to_json_paths(res, base_steps_client_names),
+        ),
+        list(route53_hosted_zones_name_id.items()),
+        desc="Route53 List Resource Record Sets",
+    )
+    if errors:
+        logger.error(f"## ERROR: Could not list resource record sets, for hosted zones: {[i[0] for i in errors]}")
+        cf.write_to_json_paths(res, base_steps_client_names)
+        sys.exit(1)
+    route53_list_resource_record_sets_map: dict[str, list[dict]] = {
+        k[0]: v for k, v in route53_list_resource_record_sets_res.items() if v
+    }
+
+    # Resolve each (ACM and AWS Amplify) domain name to its most specific (public) hosted zone
+    zone_trie = ZoneTrie(route53_hosted_zones_name_id)
 
     route53_list_resource_record_sets_map_acm: dict[str, list[dict]] = dict(route53_list_resource_record_sets_map)
     route53_list_resource_record_sets_map_amplify: dict[str, list[dict]] = dict(route53_list_resource_record_sets_map)
 
-    is_next_token = True
-    next_token = None
-    acm_certificates_meta: list[dict] = []
-    while is_next_token:
-        try:
-            acm_list_certificates_res = acm.list_certificates(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## ACM List Certificates successful response")
-        except ClientError as ex:
-            logger.error(f"## ACM List Certificates ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        for certificate_arn in [i["CertificateArn"] for i in acm_list_certificates_res["CertificateSummaryList"]]:
-            try:
-                acm_describe_certificate_res = acm.describe_certificate(
-                    CertificateArn=certificate_arn,
-                )
-                logger.info(f"## ACM Describe Certificate successful response: '{certificate_arn}'")
-            except ClientError as ex:
-                logger.error(f"## ACM Describe Certificate ERROR: '{ex}'")
-                cf.write_to_json_paths(res, base_steps_client_names)
-                sys.exit(1)
-            acm_certificates_meta.append(acm_describe_certificate_res["Certificate"])
-        if "NextToken" in acm_list_certificates_res:
-            next_token = acm_list_certificates_res["NextToken"]
-        else:
-            is_next_token = False
+    acm_certificates_summary_meta: dict[str, dict[str, str]] = {
+        i["CertificateArn"]: get_acm_certificate_meta(i)
+        for i in cf.paginate(
+            acm.list_certificates,
+            "CertificateSummaryList",
+            "ACM List Certificates",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+        )
+        if i.get("Type") != "IMPORTED"  # Imported certificates have no domain validation records
+    }
+
+    # In incremental mode, only describe new or changed certificates (since the last run), re-using the domain
+    # validation records of all unchanged certificates (certificates no longer listed are dropped)
+    acm_certificates_index: dict[str, dict] = load_acm_certificates_index(region) if incremental else {}
+    certificate_arns_changed: list[str] = [
+        k
+        for k, v in acm_certificates_summary_meta.items()
+        if not is_acm_certificate_unchanged(v, acm_certificates_index.get(k))
+    ]
+    if incremental:
+        logger.info(
+            f"## Describing {len(certificate_arns_changed)}/{len(acm_certificates_summary_meta)} ACM certificates "
+            f"(new or changed since the last run)"
+        )
+    acm_describe_certificate_res, errors = cf.fan_out(
+        partial(describe_acm_certificate, acm), certificate_arns_changed, desc="ACM Describe Certificate"
+    )
+    if errors:
+        logger.error(f"## ERROR: Could not describe ACM certificates: {list(errors)}")
+        cf.write_to_json_paths(res, base_steps_client_names)
+        sys.exit(1)
+    acm_certificates_index = {
+        k: {
+            **v,
+            **(acm_describe_certificate_res[k] if k in acm_describe_certificate_res else acm_certificates_index[k]),
+        }
+        for k, v in acm_certificates_summary_meta.items()
+        if acm_describe_certificate_res.get(k, {}) is not None
+    }
+    if incremental:
+        save_acm_certificates_index(region, acm_certificates_index)
+    acm_certificates_meta: list[dict] = list(acm_certificates_index.values())
 
     for acm_certificate_meta in acm_certificates_meta:
-        url: str = f"https://{acm_certificate_meta['DomainName']}"
-        route53_resource_record_sets_key: str = f"{get_tld(url, as_object=True).fld}."
+        route53_resource_record_sets_key: str = zone_trie.get(acm_certificate_meta["DomainName"])
         if (
             route53_resource_record_sets := route53_list_resource_record_sets_map_acm.get(
                 route53_resource_record_sets_key
             )
         ) and (
             acm_certificate_resource_record_names := {
-                i["ResourceRecord"][key_name] for i in acm_certificate_meta["DomainValidationOptions"]
+                i["ResourceRecord"][key_name]
+                for i in acm_certificate_meta.get("DomainValidationOptions", [])
+                if "ResourceRecord" in i
             }
         ):
             route53_list_resource_record_sets_map_acm[route53_resource_record_sets_key] = [
@@ -175,38 +400,17 @@ def main(region: str):
         k: v for k, v in route53_list_resource_record_sets_map_acm.items() if v
     }
 
-    amplify_certificates_meta: list[tuple[str, dict]] = []
-    amplify_cert_meta_keys: list[str] = [key_name, key_type, key_value]
-    for r, _ in cf.region_timezones_meta.items():
-        amplify = cf.get_client(r, aws.amplify_str)
-        for amplify_app in cf.amplify_list_apps(amplify):
-            amplify_app_name: str = amplify_app["name"]
-            try:
-                amplify_list_domain_associations_res = amplify.list_domain_associations(appId=amplify_app["appId"])
-                logger.info(f"## Amplify List Domain Associations successful response: '{amplify_app_name}'")
-            except ClientError as ex:
-                logger.error(f"## Amplify List Domain Associations ERROR: '{ex}'")
-                cf.write_to_json_paths(res, base_steps_client_names)
-                sys.exit(1)
-            amplify_certificates_meta += [
-                (
-                    f"{get_tld(url, as_object=True).fld}.",
-                    {
-                        amplify_cert_meta_keys[n]: amplify_cert_meta_item
-                        for n, amplify_cert_meta_item in enumerate(i["certificateVerificationDNSRecord"].split(sep=" "))
-                    },
-                )
-                for i in amplify_list_domain_associations_res["domainAssociations"]
-                if (url := f"https://{i['domainName']}")
-            ]
-
+    # Hosted zone name -> AWS Amplify certificate verification DNS record names (across all AWS regions and apps),
+    # each AWS region and each AWS Amplify app (per AWS region) listed concurrently
     amplify_certificates_meta_map: dict[str, set[str]] = {}
-    for k, v in amplify_certificates_meta:
-        if k not in amplify_certificates_meta_map:
-            amplify_certificates_meta_map[k] = set()
-        new_meta = amplify_certificates_meta_map[k]
-        new_meta.add(v[key_name])
-        amplify_certificates_meta_map[k] = new_meta
+    _, errors = cf.fan_out_regions(
+        partial(add_amplify_certificates_meta, zone_trie, amplify_certificates_meta_map, threading.Lock()),
+        desc="Amplify List Domain Associations",
+    )
+    if errors:
+        logger.error(f"## ERROR: Could not retrieve AWS Amplify domain associations, in AWS regions: {list(errors)}")
+        cf.write_to_json_paths(res, base_steps_client_names)
+        sys.exit(1)
 
     route53_resource_record_sets_keys_found = set()
     for (
@@ -240,30 +444,47 @@ def main(region: str):
         for k, v in chain.from_iterable(map(methodcaller("items"), route53_list_resource_record_sets_map_all)):
             route53_list_resource_record_sets_dd[k].extend(v)
 
+        # Submit the change batches of different hosted zones concurrently (paced by the shared Route53 rate limiter),
+        # then wait for all the changes submitted to be 'INSYNC'
+        route53_changes: dict[str, list[dict]] = {
+            k: [{"Action": record_change_action, "ResourceRecordSet": meta} for meta in v]
+            for k, v in route53_list_resource_record_sets_dd.items()
+            if v
+        }
+        route53_change_res: dict[str, list[dict]] = {k: [] for k in route53_changes}
+        _, errors = cf.fan_out(
+            partial(
+                change_route53_resource_record_sets,
+                clients[aws.route53_str],
+                route53_hosted_zones_name_id,
+                route53_changes,
+                route53_change_res,
+            ),
+            list(route53_changes),
+            desc="Route53 Change Resource Record Sets",
+        )
         res[aws.route53_str]["change_resource_record_sets"] = {}
-        for k, v in route53_list_resource_record_sets_dd.items():
+        for k, v in route53_change_res.items():
             if v:
-                route53_hosted_zone_id: str = route53_hosted_zones_name_id[k]
-                changes: list = [{"Action": record_change_action, "ResourceRecordSet": meta} for meta in v]
-                try:
-                    res[aws.route53_str]["change_resource_record_sets"][k] = clients[
-                        aws.route53_str
-                    ].change_resource_record_sets(
-                        HostedZoneId=route53_hosted_zone_id,
-                        ChangeBatch={
-                            "Comment": f"Change batch request (from: '{cf.filename}' script) to '{record_change_action}' "
-                            f"({len(changes)}x) '{record_type}' type records (for domain: '{k}') in "
-                            f"hosted zone: {route53_hosted_zone_id}",
-                            "Changes": changes,
-                        },
-                    )
-                    logger.info(
-                        f"## Route53 Change Resource Record Sets ({record_change_action}) successful response: '{k}'"
-                    )
-                except ClientError as ex:
-                    logger.error(f"## Route53 Change Resource Record Sets ERROR: '{ex}'")
-                    cf.write_to_json_paths(res, base_steps_client_names)
-                    sys.exit(1)
+                res[aws.route53_str]["change_resource_record_sets"][k] = v
+        change_ids: list[str] = [i["ChangeInfo"]["Id"] for v in route53_change_res.values() for i in v]
+        change_ids_pending, change_ids_errors = wait_for_route53_changes(clients[aws.route53_str], change_ids)
+        logger.info(
+            f"## Route53 changes '{route53_change_status_insync}': "
+            f"{len(change_ids) - len(change_ids_pending) - len(change_ids_errors)}/{len(change_ids)}"
+        )
+        if errors:
+            logger.error(f"## ERROR: Could not change resource record sets, for hosted zones: {list(errors)}")
+        if change_ids_pending:
+            logger.error(
+                f"## ERROR: Route53 changes not '{route53_change_status_insync}' after "
+                f"{route53_get_change_timeout}s: {change_ids_pending}"
+            )
+        if change_ids_errors:
+            logger.error(f"## ERROR: Could not get the status of Route53 changes: {list(change_ids_errors)}")
+        if errors or change_ids_pending or change_ids_errors:
+            cf.write_to_json_paths(res, base_steps_client_names)
+            sys.exit(1)
     else:
         logger.info(f"## No AWS Route53 DNS ('{record_type}') records to clean-up.")
 
@@ -286,5 +507,22 @@ if __name__ == "__main__":
     #     help="Specify the AWS region code, eg. '--region eu-west-2'.",
     #     type=str,
     # )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Optionally, cache read-only AWS API responses on-disk, for re-use in subsequent runs (see TTLs per AWS API "
+        "operation in 'CommonFuncs.response_cache_ttls').",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Optionally, ignore any cached AWS API responses, and refresh the on-disk cache (implies '--cache').",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Optionally, only describe the ACM certificates which are new or changed (by status or renewal) since the "
+        "last '--incremental' run, re-using the (on-disk) domain validation records of all other ACM certificates.",
+    )
     args = parser.parse_args()
-    main(region="us-east-1")
+    main(region="us-east-1", cache=args.cache, refresh=args.refresh, incremental=args.incremental)
@@ -1,6 +1,15 @@
+import csv
+import heapq
+import json
 import logging
 import os
 import sys
+import threading
+from array import array
+from functools import partial
+from itertools import chain
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
 
 from botocore.exceptions import ClientError
 
@@ -22,6 +31,7 @@ cf = CommonFuncs(
 )
 
 filename_txt: str = f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-untracked-list.txt"
+filename_index: str = f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-index"
 
 sep: str = "/"
 
@@ -30,203 +40,712 @@ def get_log_group_name_prefix(comps: list[str]) -> str:
     return f"{sep}{sep.join(comps)}{sep}"
 
 
-log_group_name_prefix_ecs_cluster: str = get_log_group_name_prefix(["aws", "ecs", "containerinsights"])
-log_group_name_prefix_lambda_func: str = get_log_group_name_prefix(["aws", "lambda"])
-log_group_name_prefix_rds_instance: str = get_log_group_name_prefix(["aws", "rds", "instance"])
+type_logs_log_group = "AWS::Logs::LogGroup"
 
-log_group_name_suffix_ecs_cluster: str = ["performance"]
-log_group_name_suffix_rds_instance: str = ["error", "general", "slowquery", "audit"]
+ecs_describe_clusters_max: int = 100
 
-type_ecs_cluster = "AWS::ECS::Cluster"
-type_lambda_function = "AWS::Lambda::Function"
-type_logs_log_group = "AWS::Logs::LogGroup"
-type_rds_instance = "AWS::RDS::DBInstance"
 
+class PrefixTrie:
+    # Character trie of (string) prefixes, finding the value of the longest prefix of a string in O(len(string)),
+    # regardless of the number of prefixes
+    def __init__(self):
+        self.root: dict = {}
 
-def get_log_groups_names(cloudformation_list_stack_resources_res: dict) -> list[str]:
-    log_groups_names: list[str] = []
-    for i in cloudformation_list_stack_resources_res["StackResourceSummaries"]:
-        resource_type = i["ResourceType"]
-        if any(
-            resource_type == t for t in [type_logs_log_group, type_lambda_function, type_ecs_cluster, type_rds_instance]
-        ):
-            physical_id = i["PhysicalResourceId"]
-            if resource_type == type_lambda_function:
-                names = [f"{log_group_name_prefix_lambda_func}{physical_id}"]
-            elif resource_type == type_ecs_cluster:
-                names = [
-                    sep.join([f"{log_group_name_prefix_ecs_cluster}{physical_id}", s])
-                    for s in log_group_name_suffix_ecs_cluster
-                ]
-            elif resource_type == type_rds_instance:
-                names = [
-                    sep.join([f"{log_group_name_prefix_rds_instance}{physical_id}", s])
-                    for s in log_group_name_suffix_rds_instance
-                ]
-            else:
-                names = [physical_id]
-            for name in names:
-                log_groups_names.append(name)
-    return list(set(log_groups_names))
+    def insert(self, prefix: str, value: Any):
+        node: dict = self.root
+        for c in prefix:
+            node = node.setdefault(c, {})
+        node[None] = value  # A 'None' key (never a character) marks the end of a prefix
 
+    def get(self, s: str) -> Any:
+        node: dict = self.root
+        value: Any = node.get(None)
+        for c in s:
+            if (node := node.get(c)) is None:
+                break
+            value = node.get(None, value)
+        return value
 
-def main(region: str):
-    cf.info_log_starting()
 
-    cloudformation = cf.get_client(region, aws.cloudformation_str)
-    ecs = cf.get_client(region, aws.ecs_str)
-    lambda_ = cf.get_client(region, aws.lambda_str)
-    rds = cf.get_client(region, aws.rds_str)
+class LogGroupResolver:
+    # A type of AWS resource (by AWS CloudFormation resource type) sending logs to log groups named
+    # '<prefix><resource name>[/<suffix>]', and how to bulk-list the names of all existing AWS resources of the type
+    def __init__(
+        self,
+        resource_type: str,
+        client_name: str,
+        log_group_name_prefix: str,
+        list_resource_names: Callable[..., set[str]],
+        log_group_name_suffixes: list[str] = None,
+    ):
+        self.resource_type = resource_type
+        self.client_name = client_name
+        self.log_group_name_prefix = log_group_name_prefix
+        self.list_resource_names = list_resource_names
+        self.log_group_name_suffixes = log_group_name_suffixes
 
-    clients, res = cf.get_clients_and_res_objs(region, base_steps_client_names)
+    def get_log_group_names(self, resource_name: str) -> list[str]:
+        log_group_name: str = f"{self.log_group_name_prefix}{resource_name}"
+        if self.log_group_name_suffixes:
+            return [sep.join([log_group_name, s]) for s in self.log_group_name_suffixes]
+        return [log_group_name]
 
-    is_next_token: bool = True
-    next_token: str = None
-    cdk_stack_name_ids: list[tuple[str, str]] = []
-    while is_next_token:
-        try:
-            cloudformation_describe_stacks_res = cloudformation.describe_stacks(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
+    def get_resource_name(self, log_group_name: str) -> str:
+        return log_group_name[len(self.log_group_name_prefix) :].split(sep=sep, maxsplit=1)[0]
+
+
+class LogGroupIndex:
+    # Columnar index of log group metadata (one typed array per attribute, rather than a dict per log group), built from
+    # the same 'describe_log_groups' pages as the clean-up (so without extra AWS API calls), for exporting (CSV/NDJSON)
+    # and ranked queries, e.g. the top-N log groups by stored bytes. Queries return row numbers.
+    columns: list[str] = [
+        "accountId",
+        "region",
+        "logGroupName",
+        "status",
+        "creationTime",
+        "retentionInDays",
+        "storedBytes",
+        "metricFilterCount",
+    ]
+    # Status of a log group: provisioned by a CDK stack, or not, or not and its AWS resource no longer exists
+    statuses: list[str] = ["tracked", "untracked", "orphaned"]
+    tracked, untracked, orphaned = range(len(statuses))
+
+    def __init__(self):
+        self.targets: list[tuple[str, str]] = []  # AWS account ID and AWS region, of each 'scan'
+        self.target_ids: array = array("H")
+        self.log_group_names: list[str] = []
+        self.status_ids: bytearray = bytearray()
+        self.creation_times: array = array("q")  # Milliseconds since the epoch
+        self.retention_in_days: array = array("H")  # 0: never expire
+        self.stored_bytes: array = array("q")
+        self.metric_filter_counts: array = array("H")
+
+    def __len__(self) -> int:
+        return len(self.log_group_names)
+
+    def scan(self, log_groups: Iterable[dict], account_id: str, region: str, tracked: set[str]) -> Iterator[dict]:
+        # Index each log group as it is streamed through (to the clean-up)
+        self.targets.append((account_id, region))
+        target_id: int = len(self.targets) - 1
+        for i in log_groups:
+            self.target_ids.append(target_id)
+            self.log_group_names.append(i["logGroupName"])
+            self.status_ids.append(self.tracked if i["logGroupName"] in tracked else self.untracked)
+            self.creation_times.append(i.get("creationTime", 0))
+            self.retention_in_days.append(i.get("retentionInDays", 0))
+            self.stored_bytes.append(i.get("storedBytes", 0))
+            self.metric_filter_counts.append(i.get("metricFilterCount", 0))
+            yield i
+
+    def mark_orphaned(self, is_orphaned: Callable[[str], bool]):
+        for n, log_group_name in enumerate(self.log_group_names):
+            if self.status_ids[n] == self.untracked and is_orphaned(log_group_name):
+                self.status_ids[n] = self.orphaned
+
+    def extend(self, other: "LogGroupIndex"):
+        offset: int = len(self.targets)
+        self.targets += other.targets
+        self.target_ids.extend(i + offset for i in other.target_ids)
+        self.log_group_names += other.log_group_names
+        self.status_ids += other.status_ids
+        self.creation_times += other.creation_times
+        self.retention_in_days += other.retention_in_days
+        self.stored_bytes += other.stored_bytes
+        self.metric_filter_counts += other.metric_filter_counts
+
+    def row(self, n: int) -> dict[str, Any]:
+        return dict(
+            zip(
+                self.columns,
+                [
+                    *self.targets[self.target_ids[n]],
+                    self.log_group_names[n],
+                    self.statuses[self.status_ids[n]],
+                    self.creation_times[n],
+                    self.retention_in_days[n] if self.retention_in_days[n] else None,
+                    self.stored_bytes[n],
+                    self.metric_filter_counts[n],
+                ],
             )
-            logger.info("## CloudFormation Describe Stacks successful response")
-        except ClientError as ex:
-            logger.error(f"## CloudFormation Describe Stacks ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        cdk_stack_name_ids += [(i["StackName"], i["StackId"]) for i in cloudformation_describe_stacks_res["Stacks"]]
-        if "NextToken" in cloudformation_describe_stacks_res:
-            next_token = cloudformation_describe_stacks_res["NextToken"]
-        else:
-            is_next_token = False
-
-    cdk_stack_log_group_names: dict[str, list[str]] = {}
-    for cdk_stack_name, cdk_stack_id in cdk_stack_name_ids:
-        is_next_token = True
-        next_token = None
-        while is_next_token:
-            try:
-                cloudformation_list_stack_resources_res = cloudformation.list_stack_resources(
-                    StackName=cdk_stack_id,
-                    **{
-                        k: v
-                        for k, v in {
-                            "NextToken": next_token if next_token else None,
-                        }.items()
-                        if v
-                    },
-                )
-                logger.info(f"## CloudFormation List Stack Resources successful response: '{cdk_stack_name}'")
-            except ClientError as ex:
-                logger.error(f"## CloudFormation List Stack Resources ERROR: '{ex}'")
-                cf.write_to_json_paths(res, base_steps_client_names)
-                sys.exit(1)
-            if log_groups_names := get_log_groups_names(cloudformation_list_stack_resources_res):
-                cdk_stack_log_group_names[cdk_stack_name] = (
-                    (names + log_groups_names)
-                    if (names := cdk_stack_log_group_names.get(cdk_stack_name))
-                    else log_groups_names
-                )
-            if "NextToken" in cloudformation_list_stack_resources_res:
-                next_token = cloudformation_list_stack_resources_res["NextToken"]
-            else:
-                is_next_token = False
-
-    cw_log_group_names: set[str] = set()
-    is_next_token = True
-    next_token = None
-    iter_: int = 0
-    while is_next_token:
-        iter_ += 1
+        )
+
+    def top_stored_bytes(self, top: int, ns: Iterable[int] = None) -> list[int]:
+        return heapq.nlargest(top, ns if ns is not None else range(len(self)), key=self.stored_bytes.__getitem__)
+
+    def no_retention(self) -> Iterator[int]:
+        return (n for n, i in enumerate(self.retention_in_days) if not i)
+
+    def orphaned_above(self, min_stored_bytes: int) -> Iterator[int]:
+        return (
+            n for n, i in enumerate(self.status_ids) if i == self.orphaned and self.stored_bytes[n] > min_stored_bytes
+        )
+
+    def to_csv(self, path: str):
+        with open(path, "w+", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(self.columns)  # Add column headers
+            writer.writerows(self.row(n).values() for n in range(len(self)))
+
+    def to_ndjson(self, path: str):
+        with open(path, "w+", encoding="utf-8") as f:
+            f.writelines(f"{json.dumps(self.row(n))}\n" for n in range(len(self)))
+
+
+def get_lambda_func_names(lambda_, on_error: Callable = None) -> set[str]:
+    return {
+        i["FunctionName"]
+        for i in cf.paginate(
+            lambda_.list_functions,
+            "Functions",
+            "Lambda List Functions",
+            token_key="Marker",
+            res_token_key="NextMarker",
+            on_error=on_error,
+            MaxItems=50,  # Max: 50
+        )
+    }
+
+
+def get_ecs_cluster_names(ecs, on_error: Callable = None) -> set[str]:
+    # Active ECS cluster names (the ECS cluster ARNs listed can include INACTIVE ECS clusters, for a while)
+    ecs_cluster_arns: list[str] = list(
+        cf.paginate(
+            ecs.list_clusters,
+            "clusterArns",
+            "ECS List Clusters",
+            token_key="nextToken",
+            on_error=on_error,
+            maxResults=100,  # Max: 100
+        )
+    )
+    ecs_cluster_names: set[str] = set()
+    for n in range(0, len(ecs_cluster_arns), ecs_describe_clusters_max):
         try:
-            logs_describe_log_groups_res = clients[aws.logs_str].describe_log_groups(
-                limit=50,  # Max: 50
-                **{
-                    k: v
-                    for k, v in {
-                        "nextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                },
+            ecs_describe_clusters_res = ecs.describe_clusters(
+                clusters=ecs_cluster_arns[n : n + ecs_describe_clusters_max]
+            )
+            logger.info(
+                f"## ECS Describe Clusters successful response: "
+                f"({n + 1}-{min(n + ecs_describe_clusters_max, len(ecs_cluster_arns))}/{len(ecs_cluster_arns)})"
             )
-            logger.info(f"## CloudWatch Logs List Stack Resources successful response ({iter_})")
         except ClientError as ex:
-            logger.error(f"## CloudWatch Logs List Stack Resources ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
+            logger.error(f"## ECS Describe Clusters ERROR: '{ex}'")
+            if on_error:
+                on_error()
             sys.exit(1)
-        cw_log_group_names = cw_log_group_names.union(
-            {i["logGroupName"] for i in logs_describe_log_groups_res["logGroups"] if i["storedBytes"] == 0}
+        ecs_cluster_names |= {
+            i["clusterName"] for i in ecs_describe_clusters_res["clusters"] if i["status"] != "INACTIVE"
+        }
+    return ecs_cluster_names
+
+
+def get_rds_instance_names(rds, on_error: Callable = None) -> set[str]:
+    return {
+        i["DBInstanceIdentifier"]
+        for i in cf.paginate(
+            rds.describe_db_instances,
+            "DBInstances",
+            "RDS Describe DB Instances",
+            token_key="Marker",
+            on_error=on_error,
+            MaxRecords=100,  # Max: 100
         )
-        if "nextToken" in logs_describe_log_groups_res:
-            next_token = logs_describe_log_groups_res["nextToken"]
-        else:
-            is_next_token = False
+    }
+
+
+# To support another type of AWS resource sending logs, register a resolver for it here
+log_group_resolvers: list[LogGroupResolver] = [
+    LogGroupResolver(
+        "AWS::ECS::Cluster",
+        aws.ecs_str,
+        get_log_group_name_prefix(["aws", "ecs", "containerinsights"]),
+        get_ecs_cluster_names,
+        log_group_name_suffixes=["performance"],
+    ),
+    LogGroupResolver(
+        "AWS::Lambda::Function",
+        aws.lambda_str,
+        get_log_group_name_prefix(["aws", "lambda"]),
+        get_lambda_func_names,
+    ),
+    LogGroupResolver(
+        "AWS::RDS::DBInstance",
+        aws.rds_str,
+        get_log_group_name_prefix(["aws", "rds", "instance"]),
+        get_rds_instance_names,
+        log_group_name_suffixes=["error", "general", "slowquery", "audit"],
+    ),
+]
+log_group_resolvers_by_type: dict[str, LogGroupResolver] = {i.resource_type: i for i in log_group_resolvers}
+
+
+def build_resolver_trie(resolvers: list[LogGroupResolver]) -> PrefixTrie:
+    # Log group name prefix -> resolver, to classify each log group name by its (longest) matching prefix
+    trie: PrefixTrie = PrefixTrie()
+    for i in resolvers:
+        trie.insert(i.log_group_name_prefix, i)
+    return trie
+
+
+log_group_resolvers_trie: PrefixTrie = build_resolver_trie(log_group_resolvers)
+
+
+def get_log_groups_names(cloudformation_list_stack_resources_res: dict) -> list[str]:
+    log_groups_names: set[str] = set()
+    for i in cloudformation_list_stack_resources_res["StackResourceSummaries"]:
+        if i["ResourceType"] == type_logs_log_group:
+            log_groups_names.add(i["PhysicalResourceId"])
+        elif log_group_resolver := log_group_resolvers_by_type.get(i["ResourceType"]):
+            log_groups_names.update(log_group_resolver.get_log_group_names(i["PhysicalResourceId"]))
+    return list(log_groups_names)
+
+
+def get_cdk_stack_log_group_names(cloudformation, cdk_stack_name_id: tuple[str, str]) -> list[str]:
+    cdk_stack_name, cdk_stack_id = cdk_stack_name_id
+    log_groups_names: list[str] = []
+    for cloudformation_list_stack_resources_res in cf.paginate_pages(
+        cloudformation.list_stack_resources,
+        f"CloudFormation List Stack Resources ('{cdk_stack_name}')",
+        StackName=cdk_stack_id,
+    ):
+        log_groups_names += get_log_groups_names(cloudformation_list_stack_resources_res)
+    return log_groups_names
+
+
+def get_target_str(region: str, role_arn: str = None) -> str:
+    # The AWS account and AWS region swept, e.g. '123456789012-eu-west-2'
+    return f"{cf.get_account_id(region, role_arn=role_arn)}-{region}"
+
+
+def get_cdk_stacks_index_path(region: str, role_arn: str = None) -> str:
+    return os.path.join(
+        cf.response_cache_dir,
+        f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-stacks-{get_target_str(region, role_arn=role_arn)}.json",
+    )
+
+
+def load_cdk_stacks_index(region: str, role_arn: str = None) -> dict[str, dict]:
+    # Stack ID -> stack name, 'LastUpdatedTime', 'StackStatus' and log group names (as of the last run)
+    if os.path.exists(cdk_stacks_index_path := get_cdk_stacks_index_path(region, role_arn=role_arn)):
+        logger.info(f"## Loaded CDK stacks index from: '{cdk_stacks_index_path}'")
+        with open(cdk_stacks_index_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_cdk_stacks_index(region: str, index: dict[str, dict], role_arn: str = None):
+    cf.make_response_cache_dir()
+    cdk_stacks_index_path: str = get_cdk_stacks_index_path(region, role_arn=role_arn)
+    logger.info(f"## Saving CDK stacks index to: '{cdk_stacks_index_path}'")
+    with open(cdk_stacks_index_path, "w+", encoding="utf-8") as f:
+        json.dump(index, f, indent=2, default=str)
+
+
+def get_cdk_stack_meta(cdk_stack: dict) -> dict[str, str]:
+    return {
+        "StackName": cdk_stack["StackName"],
+        "LastUpdatedTime": str(cdk_stack.get("LastUpdatedTime", cdk_stack["CreationTime"])),
+        "StackStatus": cdk_stack["StackStatus"],
+    }
+
+
+def is_cdk_stack_unchanged(cdk_stack_meta: dict[str, str], cdk_stack_index_meta: dict) -> bool:
+    # A stack mid-operation (e.g. 'UPDATE_IN_PROGRESS') may still change its resources, so is always re-listed
+    return (
+        cdk_stack_index_meta is not None
+        and not cdk_stack_meta["StackStatus"].endswith("_IN_PROGRESS")
+        and all(cdk_stack_index_meta.get(k) == v for k, v in cdk_stack_meta.items())
+    )
+
+
+def get_checkpoint_path(region: str, role_arn: str = None) -> str:
+    return os.path.join(
+        cf.response_cache_dir,
+        f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-checkpoint-{get_target_str(region, role_arn=role_arn)}.ndjson",
+    )
+
+
+def load_checkpoint(checkpoint_path: str) -> dict[str, str]:
+    # Log group name -> status of its (latest) deletion attempt: 'pending', 'deleted' or 'failed'
+    checkpoint: dict[str, str] = {}
+    if os.path.exists(checkpoint_path):
+        logger.info(f"## Loaded deletion checkpoint from: '{checkpoint_path}'")
+        with open(checkpoint_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    i: dict = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # A partially written last line (if the previous run was killed mid-write)
+                checkpoint[i["logGroupName"]] = i["status"]
+    return checkpoint
+
+
+class DeletionCheckpoint:
+    # Records all log groups to delete (as pending) up-front, then appends the outcome of each log group deletion to an
+    # NDJSON file as it completes (from any worker thread), so an interrupted or partially failed clean-up can be
+    # resumed, retrying only the log groups still pending (or failed), without re-listing anything
+    pending_str: str = "pending"
+    deleted_str: str = "deleted"
+    failed_str: str = "failed"
+
+    def __init__(self, path: str, resume: bool = False):
+        self.path: str = path
+        self.lock: threading.Lock = threading.Lock()
+        self.statuses: dict[str, str] = load_checkpoint(path) if resume else {}
+        if not resume and os.path.exists(path):
+            os.remove(path)
+
+    def get_not_deleted(self) -> list[str]:
+        return sorted(k for k, v in self.statuses.items() if v != self.deleted_str)
+
+    def record_pending(self, log_group_names: list[str]):
+        Path(os.path.dirname(self.path)).mkdir(mode=0o700, parents=True, exist_ok=True)
+        with self.lock, open(self.path, "a", encoding="utf-8") as f:
+            for i in log_group_names:
+                self.statuses[i] = self.pending_str
+                f.write(f"{json.dumps({'logGroupName': i, 'status': self.pending_str})}\n")
+
+    def record(self, log_group_name: str, status: str, error: str = None):
+        with self.lock:
+            self.statuses[log_group_name] = status
+            with open(self.path, "a", encoding="utf-8") as f:
+                line: dict[str, str] = {"logGroupName": log_group_name, "status": status}
+                if error:
+                    line["error"] = error
+                f.write(f"{json.dumps(line)}\n")
+
 
-    cw_log_group_names_untracked: set[str] = set(cw_log_group_names)
-    for cdk_stack_name, log_group_names in cdk_stack_log_group_names.items():
-        for log_group_name in log_group_names:
-            if log_group_name in cw_log_group_names:
-                cw_log_group_names_untracked.remove(log_group_name)
+def delete_log_group(logs, checkpoint: DeletionCheckpoint, log_group_name: str) -> dict:
+    # The logs client is shared by all workers, so deletions are throttled by its (CloudWatch Logs) rate limiter, and
+    # transient errors are retried (with back-off) by botocore, before raising a 'ClientError'
+    try:
+        delete_log_group_res: dict = logs.delete_log_group(logGroupName=log_group_name)
+    except ClientError as ex:
+        if ex.response["Error"]["Code"] == "ResourceNotFoundException":
+            # Already deleted (e.g. by a previous run, killed before recording it)
+            checkpoint.record(log_group_name, checkpoint.deleted_str)
+            return ex.response
+        checkpoint.record(log_group_name, checkpoint.failed_str, error=str(ex))
+        raise
+    checkpoint.record(log_group_name, checkpoint.deleted_str)
+    logger.info(f"## CloudWatch Logs Delete Log Group successful response: '{log_group_name}'")
+    return delete_log_group_res
+
+
+def delete_log_groups(
+    logs, res: dict, json_paths_key: str, checkpoint: DeletionCheckpoint, log_group_names: list[str]
+) -> None:
+    # Delete the log groups on a bounded worker pool, recording each outcome in the checkpoint file, so a failed
+    # deletion does not abort the others, and a re-run with '--resume' retries only the log groups not yet deleted
+    delete_log_group_res, delete_errors = cf.fan_out(
+        partial(delete_log_group, logs, checkpoint), log_group_names, desc="CloudWatch Logs Delete Log Group"
+    )
+    res[aws.logs_str]["delete_log_group"] = {}
+    for k, v in delete_log_group_res.items():
+        res[aws.logs_str]["delete_log_group"][k] = v
+    if delete_errors:
+        logger.error(
+            f"## ERROR: Could not delete {len(delete_errors)}/{len(log_group_names)} CloudWatch Logs log groups "
+            f"(see: '{checkpoint.path}'), re-run with '--resume' to retry them"
+        )
+        cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key)
+        sys.exit(1)
+    if os.path.exists(checkpoint.path):
+        os.remove(checkpoint.path)
+
+
+def resume_clean_up_log_groups(target: tuple[str, str], json_paths_key: str) -> None:
+    # Retry only the log groups still pending (or failed) in the checkpoint file of a previous run
+    region, role_arn = target
+    clients, res = cf.get_clients_and_res_objs(
+        region, base_steps_client_names, json_paths_key=json_paths_key, role_arn=role_arn
+    )
+    checkpoint = DeletionCheckpoint(get_checkpoint_path(region, role_arn=role_arn), resume=True)
+    if cw_log_group_names_to_delete_list := checkpoint.get_not_deleted():
+        logger.info(
+            f"## Resuming deletion of {len(cw_log_group_names_to_delete_list)}/{len(checkpoint.statuses)} CloudWatch "
+            f"Logs log groups (pending or failed), AWS account and region: {get_target_str(region, role_arn)}"
+        )
+        delete_log_groups(clients[aws.logs_str], res, json_paths_key, checkpoint, cw_log_group_names_to_delete_list)
+    else:
+        logger.info(
+            f"## No CloudWatch Logs log group deletions to resume, AWS account and region: "
+            f"{get_target_str(region, role_arn)}"
+        )
+        if os.path.exists(checkpoint.path):
+            os.remove(checkpoint.path)
+    cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key)
+
+
+def clean_up_log_groups(
+    untracked: dict[tuple[str, str], list[str]],
+    indexes: dict[tuple[str, str], LogGroupIndex],
+    json_paths_keys: dict[tuple[str, str], str],
+    incremental: bool,
+    log_group_name_prefix: str,
+    log_group_name_pattern: str,
+    resume: bool,
+    target: tuple[str, str],
+):
+    # Clean-up the log groups of a single AWS region (and AWS account, via the IAM role assumed, if any), recording the
+    # untracked log groups (not deleted) in 'untracked', for the (merged) untracked list, and (if 'indexes' is given)
+    # the log group metadata index in 'indexes'
+    region, role_arn = target
+    json_paths_key: str = json_paths_keys.get(target)
+    if resume:
+        resume_clean_up_log_groups(target, json_paths_key)
+        return
+    logger.info(
+        f"## Cleaning up CloudWatch Logs log groups, AWS account and region: {get_target_str(region, role_arn)}"
+    )
+
+    cloudformation = cf.get_client(region, aws.cloudformation_str, role_arn=role_arn)
+
+    clients, res = cf.get_clients_and_res_objs(
+        region, base_steps_client_names, json_paths_key=json_paths_key, role_arn=role_arn
+    )
+
+    cdk_stacks_meta: dict[str, dict[str, str]] = {
+        i["StackId"]: get_cdk_stack_meta(i)
+        for i in cf.paginate(
+            cloudformation.describe_stacks,
+            "Stacks",
+            "CloudFormation Describe Stacks",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key),
+        )
+    }
+    cdk_stack_name_ids: list[tuple[str, str]] = [(v["StackName"], k) for k, v in cdk_stacks_meta.items()]
+
+    # In incremental mode, only re-list the resources of new or changed stacks (since the last run), re-using the log
+    # group names of all unchanged stacks (deleted stacks are dropped, as they are no longer described)
+    cdk_stacks_index: dict[str, dict] = load_cdk_stacks_index(region, role_arn=role_arn) if incremental else {}
+    cdk_stack_name_ids_changed: list[tuple[str, str]] = [
+        (cdk_stack_name, cdk_stack_id)
+        for cdk_stack_name, cdk_stack_id in cdk_stack_name_ids
+        if not is_cdk_stack_unchanged(cdk_stacks_meta[cdk_stack_id], cdk_stacks_index.get(cdk_stack_id))
+    ]
+    if incremental:
+        logger.info(
+            f"## Listing stack resources, for {len(cdk_stack_name_ids_changed)}/{len(cdk_stack_name_ids)} CDK stacks "
+            f"(new or changed since the last run)"
+        )
+
+    # List each stack's resources on a bounded worker pool (rate-limited per AWS service, by the shared client), the
+    # results are merged in the same order as the stacks, regardless of completion order
+    cdk_stack_log_group_names_res: dict[tuple[str, str], list[str]]
+    cdk_stack_log_group_names_res, errors = cf.fan_out(
+        partial(get_cdk_stack_log_group_names, cloudformation),
+        cdk_stack_name_ids_changed,
+        desc="CloudFormation List Stack Resources",
+    )
+    cdk_stacks_index = {
+        cdk_stack_id: {
+            **cdk_stacks_meta[cdk_stack_id],
+            "log_group_names": (
+                cdk_stack_log_group_names_res[(cdk_stack_name, cdk_stack_id)]
+                if (cdk_stack_name, cdk_stack_id) in cdk_stack_log_group_names_res
+                else cdk_stacks_index[cdk_stack_id]["log_group_names"]
+            ),
+        }
+        for cdk_stack_name, cdk_stack_id in cdk_stack_name_ids
+        if (cdk_stack_name, cdk_stack_id) not in errors
+    }
+    if incremental:
+        save_cdk_stacks_index(region, cdk_stacks_index, role_arn=role_arn)
+    cdk_stack_log_group_names: dict[str, list[str]] = {
+        v["StackName"]: v["log_group_names"] for v in cdk_stacks_index.values() if v["log_group_names"]
+    }
+
+    # Stream the log groups (optionally filtered server-side, by log group name prefix or pattern), only holding the
+    # candidates for deletion: empty log groups, not provisioned by (or for resources in) any CDK stack
+    cdk_stack_log_group_names_tracked: set[str] = set(chain.from_iterable(cdk_stack_log_group_names.values()))
+    describe_log_groups_kwargs: dict[str, str] = {
+        k: v
+        for k, v in {"logGroupNamePrefix": log_group_name_prefix, "logGroupNamePattern": log_group_name_pattern}.items()
+        if v
+    }
+    log_group_name_pattern_local: str = None
+    if log_group_name_pattern and "logGroupNamePattern" not in (
+        clients[aws.logs_str].meta.service_model.operation_model("DescribeLogGroups").input_shape.members
+    ):
+        # Older botocore versions do not support 'logGroupNamePattern', so filter on it locally instead (matching it
+        # case-insensitively, as the server-side filter does)
+        log_group_name_pattern_local = describe_log_groups_kwargs.pop("logGroupNamePattern").lower()
+    log_groups: Iterable[dict] = cf.paginate(
+        clients[aws.logs_str].describe_log_groups,
+        "logGroups",
+        "CloudWatch Logs Describe Log Groups",
+        token_key="nextToken",
+        on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key),
+        limit=50,  # Max: 50
+        **describe_log_groups_kwargs,
+    )
+    if log_group_name_pattern_local is not None:
+        log_groups = (i for i in log_groups if log_group_name_pattern_local in i["logGroupName"].lower())
+    index: LogGroupIndex = None
+    if indexes is not None:
+        index = LogGroupIndex()
+        log_groups = index.scan(
+            log_groups, cf.get_account_id(region, role_arn=role_arn), region, cdk_stack_log_group_names_tracked
+        )
+    cw_log_group_names_untracked: set[str] = {
+        log_group_name
+        for i in log_groups
+        if i["storedBytes"] == 0 and (log_group_name := i["logGroupName"]) not in cdk_stack_log_group_names_tracked
+    }
+
+    if errors:
+        # Log groups of the stacks which could not be listed would appear untracked, so do not delete any
+        logger.error(
+            f"## ERROR: Could not list stack resources, for CDK stacks: {[i[0] for i in errors]} (listed "
+            f"{len(cdk_stacks_index)}/{len(cdk_stack_name_ids)} CDK stacks), will NOT delete any "
+            f"CloudWatch Logs log groups, AWS account and region: {get_target_str(region, role_arn)}"
+        )
+        untracked[target] = sorted(cw_log_group_names_untracked)
+        cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key)
+        sys.exit(1)
+
+    # Classify each untracked log group by the resolver of its log group name prefix (if any), bulk-listing the AWS
+    # resources of each resolver (at most once, only if it has any untracked log groups), to check each log group's
+    # AWS resource still exists with a set lookup, rather than an AWS API call
+    resource_names: dict[LogGroupResolver, set[str]] = {}
+
+    def is_orphaned(log_group_name: str) -> bool:
+        if (log_group_resolver := log_group_resolvers_trie.get(log_group_name)) is None:
+            return False
+        if log_group_resolver not in resource_names:
+            resource_names[log_group_resolver] = log_group_resolver.list_resource_names(
+                cf.get_client(region, log_group_resolver.client_name, role_arn=role_arn),
+                lambda: cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key),
+            )
+        return log_group_resolver.get_resource_name(log_group_name) not in resource_names[log_group_resolver]
+
+    if index is not None:
+        index.mark_orphaned(is_orphaned)
+        indexes[target] = index
 
     if cw_log_group_names_untracked:
         cw_log_group_names_untracked_list: list[str] = sorted(cw_log_group_names_untracked)
-        res[aws.logs_str]["delete_log_group"] = {}
-        with open(filename_txt, "w+", encoding="utf-8") as f:
-            for i in cw_log_group_names_untracked_list:
-                to_delete = False
-                if i.startswith(log_group_name_prefix_lambda_func):
-                    lambda_func_name = i[len(log_group_name_prefix_lambda_func) :]
-                    try:
-                        lambda_.get_function(FunctionName=lambda_func_name)
-                        logger.info(f"## Lambda Get Function successful response: '{lambda_func_name}'")
-                    except lambda_.exceptions.ResourceNotFoundException:
-                        to_delete = True
-                    except ClientError as ex:
-                        logger.error(f"## Lambda Get Function ERROR: '{ex}'")
-                elif i.startswith(log_group_name_prefix_ecs_cluster):
-                    ecs_cluster_name = i[len(log_group_name_prefix_ecs_cluster) :].rsplit(sep=sep, maxsplit=1)[0]
-                    try:
-                        ecs_describe_clusters_res = ecs.describe_clusters(clusters=[ecs_cluster_name])
-                        logger.info(f"## ECS Describe Clusters successful response: '{ecs_cluster_name}'")
-                        if (
-                            (failures := ecs_describe_clusters_res["failures"]) and failures[0]["reason"] == "MISSING"
-                        ) or (
-                            (clusters := ecs_describe_clusters_res["clusters"]) and clusters[0]["status"] == "INACTIVE"
-                        ):
-                            to_delete = True
-                    except ClientError as ex:
-                        logger.error(f"## ECS Describe Clusters ERROR: '{ex}'")
-                elif i.startswith(log_group_name_prefix_rds_instance):
-                    rds_instance_name = i[len(log_group_name_prefix_rds_instance) :].rsplit(sep=sep, maxsplit=1)[0]
-                    try:
-                        rds.describe_db_instances(DBInstanceIdentifier=rds_instance_name)
-                        logger.info(f"## RDS Describe DB Instances successful response: '{rds_instance_name}'")
-                    except rds.exceptions.DBInstanceNotFoundFault:
-                        to_delete = True
-                    except ClientError as ex:
-                        logger.error(f"## RDS Describe DB Instances ERROR: '{ex}'")
-                if to_delete:
-                    try:
-                        res[aws.logs_str]["delete_log_group"][i] = clients[aws.logs_str].delete_log_group(
-                            logGroupName=i
-                        )
-                        logger.info(f"## CloudWatch Logs Delete Log Group successful response: '{i}'")
-                    except ClientError as ex:
-                        logger.error(f"## CloudWatch Logs Delete Log Group ERROR: '{ex}'")
-                        cf.write_to_json_paths(res, base_steps_client_names)
-                        sys.exit(1)
-                else:
-                    logger.info(f"## Skipping deletion of CloudWatch Logs log group: '{i}'")
-                    f.write(f"{i}\n")
+        cw_log_group_names_to_delete: set[str] = {i for i in cw_log_group_names_untracked_list if is_orphaned(i)}
+
+        cw_log_group_names_to_delete_list: list[str] = []
+        untracked[target] = []
+        for i in cw_log_group_names_untracked_list:
+            if i in cw_log_group_names_to_delete:
+                cw_log_group_names_to_delete_list.append(i)
+            else:
+                logger.info(f"## Skipping deletion of CloudWatch Logs log group: '{i}'")
+                untracked[target].append(i)
+
+        checkpoint = DeletionCheckpoint(get_checkpoint_path(region, role_arn=role_arn))
+        checkpoint.record_pending(cw_log_group_names_to_delete_list)
+        delete_log_groups(clients[aws.logs_str], res, json_paths_key, checkpoint, cw_log_group_names_to_delete_list)
     else:
-        logger.info("## No AWS CloudWatch Logs log groups to clean-up.")
+        logger.info(
+            f"## No AWS CloudWatch Logs log groups to clean-up, AWS account and region: "
+            f"{get_target_str(region, role_arn)}"
+        )
+
+    cf.write_to_json_paths(res, base_steps_client_names, json_paths_key=json_paths_key)
 
-    cf.write_to_json_paths(res, base_steps_client_names)
+
+def main(
+    region: str = None,
+    all_regions: bool = False,
+    role_arns: list[str] = None,
+    cache: bool = False,
+    refresh: bool = False,
+    incremental: bool = False,
+    log_group_name_prefix: str = None,
+    log_group_name_pattern: str = None,
+    resume: bool = False,
+    index_format: str = None,
+    top: int = None,
+    orphaned_min_bytes: int = 0,
+):
+    cf.info_log_starting()
+
+    if cache or refresh:
+        cf.use_response_cache(refresh=refresh)
+
+    # Sweep each AWS region (all AWS regions, with '--all-regions'), in each AWS account (the current one, or via each
+    # IAM role assumed) concurrently, each rate-limited separately (per AWS account and AWS region)
+    targets: list[tuple[str, str]] = [
+        (r, role_arn)
+        for role_arn in (role_arns if role_arns else [None])
+        for r in (list(cf.region_timezones_meta) if all_regions else [region])
+    ]
+    # A single target keeps the default NDJSON file names, otherwise each target has its own NDJSON files
+    json_paths_keys: dict[tuple[str, str], str] = {}
+    if len(targets) > 1:
+        for r, role_arn in targets:
+            json_paths_keys[(r, role_arn)] = get_target_str(r, role_arn)
+            cf.json_paths[json_paths_keys[(r, role_arn)]] = cf.gen_json_paths(
+                base_steps_client_names,
+                f=f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-{json_paths_keys[(r, role_arn)]}",
+            )
+
+    untracked: dict[tuple[str, str], list[str]] = {}
+    indexes: dict[tuple[str, str], LogGroupIndex] = {} if index_format or top else None
+    _, errors = cf.fan_out(
+        partial(
+            clean_up_log_groups,
+            untracked,
+            indexes,
+            json_paths_keys,
+            incremental,
+            log_group_name_prefix,
+            log_group_name_pattern,
+            resume,
+        ),
+        targets,
+        max_workers=len(targets),
+        desc="CloudWatch Logs Clean-up",
+    )
+
+    # One (merged) untracked list, in target order: log group names for a single target, otherwise log group ARNs (kept
+    # as-is when resuming, as nothing is re-listed)
+    if not resume:
+        with open(filename_txt, "w+", encoding="utf-8") as f:
+            for r, role_arn in targets:
+                for i in untracked.get((r, role_arn), []):
+                    f.write(
+                        f"{i}\n"
+                        if len(targets) == 1
+                        else f"arn:aws:logs:{r}:{cf.get_account_id(r, role_arn=role_arn)}:log-group:{i}\n"
+                    )
+
+    if indexes:
+        # One (merged) log group metadata index, in target order
+        index = LogGroupIndex()
+        for t in targets:
+            if t in indexes:
+                index.extend(indexes[t])
+        if index_format:
+            index_path: str = f"{filename_index}.{index_format}"
+            logger.info(f"## Writing log group metadata index ({len(index)} log groups) to: '{index_path}'")
+            getattr(index, f"to_{index_format}")(index_path)
+        if top:
+            for desc, ns in [
+                ("by stored bytes", None),
+                ("by stored bytes, with no retention", index.no_retention()),
+                (
+                    f"orphaned, by stored bytes (above {orphaned_min_bytes} bytes)",
+                    index.orphaned_above(orphaned_min_bytes),
+                ),
+            ]:
+                logger.info(f"## Top {top} CloudWatch Logs log groups, {desc}:")
+                for n in index.top_stored_bytes(top, ns):
+                    logger.info(f"## {json.dumps(index.row(n))}")
+
+    if errors:
+        logger.error(
+            f"## ERROR: Could not clean-up CloudWatch Logs log groups, for {len(errors)}/{len(targets)} AWS accounts "
+            f"and regions: {[get_target_str(r, role_arn) for r, role_arn in errors]}"
+        )
+        sys.exit(1)
 
     cf.info_log_finished()
 
@@ -241,11 +760,95 @@ if __name__ == "__main__":
         f"Lambda function, ECS cluster, RDS instance, etc. "
         f"(see the list of skipped AWS CloudWatch Logs log groups in: '{filename_txt}')."
     )
-    parser.add_argument(
+    regions = parser.add_mutually_exclusive_group(required=True)
+    regions.add_argument(
         "--region",
-        required=True,
         help="Specify the AWS region code, eg. '--region eu-west-2'.",
         type=str,
     )
+    regions.add_argument(
+        "--all-regions",
+        action="store_true",
+        help="Alternatively, clean-up all AWS regions (see 'CommonFuncs.region_timezones_meta') concurrently.",
+    )
+    parser.add_argument(
+        "--role-arns",
+        nargs="+",
+        help="Optionally, specify the IAM role ARNs to assume, to clean-up (concurrently) in each of their AWS "
+        "accounts, instead of the current AWS account, eg. '--role-arns arn:aws:iam::123456789012:role/role-name'.",
+        type=str,
+    )
+    parser.add_argument(
+        "--cache",
+        action="store_true",
+        help="Optionally, cache read-only AWS API responses on-disk, for re-use in subsequent runs (see TTLs per AWS API "
+        "operation in 'CommonFuncs.response_cache_ttls').",
+    )
+    parser.add_argument(
+        "--refresh",
+        action="store_true",
+        help="Optionally, ignore any cached AWS API responses, and refresh the on-disk cache (implies '--cache').",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Optionally, only list the resources of CDK stacks which are new or changed (by 'LastUpdatedTime' or "
+        "'StackStatus') since the last '--incremental' run, re-using the (on-disk) log group names of all other CDK "
+        "stacks.",
+    )
+    log_group_name_filter = parser.add_mutually_exclusive_group()
+    log_group_name_filter.add_argument(
+        "--log-group-name-prefix",
+        help="Optionally, only clean-up log groups with names starting with this prefix, eg. "
+        "'--log-group-name-prefix /aws/lambda/'.",
+        type=str,
+    )
+    log_group_name_filter.add_argument(
+        "--log-group-name-pattern",
+        help="Optionally, only clean-up log groups with names containing this (case-insensitive) string, eg. "
+        "'--log-group-name-pattern containerinsights'.",
+        type=str,
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Optionally, resume an interrupted (or partially failed) clean-up, only retrying the deletion of the log "
+        "groups still pending (or failed), as recorded in the deletion checkpoint file (without re-listing anything): "
+        f"'{os.path.join(cf.response_cache_dir, cf.filename.rsplit(sep='.', maxsplit=1)[0])}-checkpoint-"
+        "<account>-<region>.ndjson'.",
+    )
+    parser.add_argument(
+        "--index",
+        choices=["csv", "ndjson"],
+        help="Optionally, export an index of the metadata of all log groups scanned (status, creation time, retention, "
+        f"stored bytes and metric filter count), to: '{filename_index}.<csv|ndjson>'.",
+        type=str,
+    )
+    parser.add_argument(
+        "--top",
+        help="Optionally, log the top N log groups by stored bytes: of all log groups scanned, of those with no "
+        "retention, and of those orphaned (their AWS resource no longer exists), eg. '--top 10'.",
+        type=int,
+    )
+    parser.add_argument(
+        "--orphaned-min-bytes",
+        default=0,
+        help="Optionally, only rank orphaned log groups with more than this many stored bytes, with '--top' "
+        "(default: 0).",
+        type=int,
+    )
     args = parser.parse_args()
-    main(region=args.region)
+    main(
+        region=args.region,
+        all_regions=args.all_regions,
+        role_arns=args.role_arns,
+        cache=args.cache,
+        refresh=args.refresh,
+        incremental=args.incremental,
+        log_group_name_prefix=args.log_group_name_prefix,
+        log_group_name_pattern=args.log_group_name_pattern,
+        resume=args.resume,
+        index_format=args.index,
+        top=args.top,
+        orphaned_min_bytes=args.orphaned_min_bytes,
+    )
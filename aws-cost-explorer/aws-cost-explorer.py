@@ -1,10 +1,14 @@
 import csv
+import json
 import logging
 import os
 import shutil
 import sys
-from datetime import date, datetime, timedelta
+from datetime import date, datetime
+from functools import partial
+from itertools import product
 from pathlib import Path
+from typing import Callable
 
 from botocore.exceptions import ClientError
 from dateutil.relativedelta import relativedelta
@@ -38,6 +42,7 @@ amount_str: str = "Amount"
 cost_str: str = "UnblendedCost"
 end_str: str = "End"
 get_cost_and_usage_str: str = "get_cost_and_usage"
+granularity_str: str = "MONTHLY"
 metric_str: str = "Metrics"
 next_page_token_str: str = "NextPageToken"
 start_str: str = "Start"
@@ -48,6 +53,12 @@ unit_str: str = "Unit"
 tag_project_name: str = "project-name"
 tag_env_type: str = "env-type"
 
+# Cost Explorer query plan axes, as ('GroupBy' type, key), each is either grouped by or filtered on (per query)
+axis_linked_account: tuple[str, str] = ("DIMENSION", "LINKED_ACCOUNT")
+axis_project_name: tuple[str, str] = ("TAG", tag_project_name)
+axis_env_type: tuple[str, str] = ("TAG", tag_env_type)
+group_by_service: dict[str, str] = {"Type": "DIMENSION", "Key": "SERVICE"}
+
 
 def ce_get_tags(ce, time_period_meta: dict[str, str], tag_key: str) -> dict:
     try:
@@ -62,6 +73,139 @@ def ce_get_tags(ce, time_period_meta: dict[str, str], tag_key: str) -> dict:
     return None
 
 
+def get_ce_filter(axis: tuple[str, str], values: list[str]) -> dict:
+    return {
+        "Dimensions" if axis[0] == "DIMENSION" else "Tags": {
+            "Key": axis[1],
+            "Values": values,
+            "MatchOptions": ["EQUALS", "CASE_SENSITIVE"],
+        }
+    }
+
+
+def get_ce_group_value(axis: tuple[str, str], group_key: str) -> str:
+    # Tag group keys are returned as '<tag key>$<tag value>' (an empty tag value, for untagged costs)
+    return group_key.split(sep="$", maxsplit=1)[1] if axis[0] == "TAG" else group_key
+
+
+def get_ce_query_plan(
+    axes: dict[tuple[str, str], list[str]], preferred_group_by_axis: tuple[str, str] = None
+) -> tuple[tuple[str, str], list[tuple[str, str]], list[tuple[str, ...]]]:
+    # Cost Explorer allows (at most) 2 'GroupBy' keys per query: group by the 'SERVICE' dimension and the preferred axis
+    # (if any) or else the axis with the most values, and run one query per combination of values of the other axes
+    # (filtered on). The grouped axis is not filtered on, its values are filtered locally.
+    group_by_axis: tuple[str, str] = (
+        preferred_group_by_axis if preferred_group_by_axis in axes else max(axes, key=lambda k: len(axes[k]))
+    )
+    filter_axes: list[tuple[str, str]] = [k for k in axes if k != group_by_axis]
+    return group_by_axis, filter_axes, list(product(*[axes[k] for k in filter_axes]))
+
+
+def get_results_by_time_cache_path(region: str) -> str:
+    return os.path.join(
+        cf.response_cache_dir,
+        f"{cf.filename.rsplit(sep='.', maxsplit=1)[0]}-results-by-time-{cf.get_account_id(region)}-{region}.json",
+    )
+
+
+def load_results_by_time_cache(region: str) -> dict[str, dict[str, dict]]:
+    # Query key (see 'get_ce_query_key') -> time period (as '<start>_<end>') -> 'ResultsByTime' entry, of closed months
+    # only (as of the last run)
+    if os.path.exists(results_by_time_cache_path := get_results_by_time_cache_path(region)):
+        logger.info(f"## Loaded Cost Explorer results by time cache from: '{results_by_time_cache_path}'")
+        with open(results_by_time_cache_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    return {}
+
+
+def save_results_by_time_cache(region: str, cache: dict[str, dict[str, dict]]):
+    cf.make_response_cache_dir()
+    results_by_time_cache_path: str = get_results_by_time_cache_path(region)
+    logger.info(f"## Saving Cost Explorer results by time cache to: '{results_by_time_cache_path}'")
+    with open(results_by_time_cache_path, "w+", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2, default=str)
+
+
+def get_cached_group_by_axis(cache: dict[str, dict[str, dict]]) -> tuple[str, str]:
+    # The axis grouped by in the most recently planned cached queries, so a change in the number of values of each axis
+    # (e.g. a new account) does not change the query plan, and so invalidate all cached months
+    for query_key in reversed(list(cache if cache else {})):
+        group_by: dict[str, str] = json.loads(query_key)["GroupBy"][0]
+        return group_by["Type"], group_by["Key"]
+    return None
+
+
+def get_ce_query_key(query_meta: dict) -> str:
+    # The query params, except the time period (e.g. linked account and tag filters, granularity, group by)
+    return json.dumps({k: v for k, v in query_meta.items() if k != time_period_str}, sort_keys=True)
+
+
+def get_month_time_periods(time_period_meta: dict[str, str]) -> list[tuple[str, str]]:
+    # The time periods of the 'ResultsByTime' entries, of a 'MONTHLY' granularity query (the end date is exclusive)
+    start: date = date.fromisoformat(time_period_meta[start_str])
+    end: date = date.fromisoformat(time_period_meta[end_str])
+    time_periods: list[tuple[str, str]] = []
+    while start < end:
+        next_month: date = start.replace(day=1) + relativedelta(months=1)
+        time_periods.append((to_strftime(start), to_strftime(min(next_month, end))))
+        start = next_month
+    return time_periods
+
+
+def is_results_by_time_closed(entry: dict) -> bool:
+    # A month's costs are final once the month has ended, and Cost Explorer no longer marks them as estimated
+    return entry[time_period_str][end_str] <= to_strftime(date.today().replace(day=1)) and not entry.get(
+        "Estimated", True
+    )
+
+
+def get_ce_cost_and_usage_grouped(
+    ce,
+    on_error: Callable,
+    time_period_meta: dict[str, str],
+    group_by_axis: tuple[str, str],
+    filter_axes: list[tuple[str, str]],
+    results_by_time_cache: dict[str, dict[str, dict]],
+    filter_values: tuple[str, ...],
+) -> dict[tuple[str, str], dict]:
+    query_meta: dict = {
+        time_period_str: time_period_meta,
+        "Granularity": granularity_str,
+        "Filter": {"And": [get_ce_filter(axis, [value]) for axis, value in zip(filter_axes, filter_values)]},
+        metric_str: [cost_str],
+        "GroupBy": [{"Type": group_by_axis[0], "Key": group_by_axis[1]}, group_by_service],
+    }
+    # Time period -> 'ResultsByTime' entry, with the groups of all pages merged (a time period's groups may be split
+    # across pages). When caching, closed months are re-used, and only the time period from the first missing (or
+    # still open) month onwards is queried.
+    results_by_time: dict[tuple[str, str], dict] = {}
+    query_cache: dict[str, dict] = {}
+    if results_by_time_cache is not None:
+        query_cache = results_by_time_cache.setdefault(get_ce_query_key(query_meta), {})
+        for time_period in get_month_time_periods(time_period_meta):
+            if (entry := query_cache.get(sep.join(time_period))) is None:
+                query_meta[time_period_str] = {start_str: time_period[0], end_str: time_period_meta[end_str]}
+                break
+            results_by_time[time_period] = entry
+        else:
+            return results_by_time
+    for ce_get_cost_and_usage_res in cf.paginate_pages(
+        ce.get_cost_and_usage,
+        "Cost Explorer Get Cost And Usage",
+        token_key=next_page_token_str,
+        on_error=on_error,
+        **query_meta,
+    ):
+        for entry in ce_get_cost_and_usage_res["ResultsByTime"]:
+            results_by_time.setdefault(
+                time_period_to_tuple(entry[time_period_str]),
+                {time_period_str: entry[time_period_str], "Groups": [], "Estimated": entry.get("Estimated", True)},
+            )["Groups"].extend(entry["Groups"])
+    if results_by_time_cache is not None:
+        query_cache.update({sep.join(k): v for k, v in results_by_time.items() if is_results_by_time_closed(v)})
+    return results_by_time
+
+
 def sanitise(str_: str) -> str:
     return str_ if str_ else "NoTag"
 
@@ -74,7 +218,7 @@ def to_strftime(obj: date) -> str:
     return obj.strftime("%Y-%m-%d")
 
 
-def main(region: str, months: int):
+def main(region: str, months: int, incremental: bool = False):
     cf.info_log_starting()
 
     clients, res = cf.get_clients_and_res_objs(region, base_steps_client_names)
@@ -84,7 +228,7 @@ def main(region: str, months: int):
 
     first_day_this_month: date = date.today().replace(day=1)
     start_time_to_strftime: str = to_strftime(first_day_this_month + relativedelta(months=-(int(months))))
-    end_time_to_strftime: str = to_strftime(first_day_this_month - timedelta(days=1))
+    end_time_to_strftime: str = to_strftime(first_day_this_month)  # Exclusive
     time_period_meta: dict[str, str] = {start_str: start_time_to_strftime, end_str: end_time_to_strftime}
 
     tags_meta: dict[str, list[str]] = {
@@ -114,6 +258,62 @@ def main(region: str, months: int):
 
     res[aws.ce_str][get_cost_and_usage_str] = {}
     org_list_accounts_list = org_list_accounts_res["Accounts"]
+    org_accounts_active: list[dict] = [i for i in org_list_accounts_list if i["Status"] == "ACTIVE"]
+
+    # Instead of one query per account, project name and env type, group by one of them (and the service), filter on
+    # the others, and split the grouped results locally, per account, project name and env type
+    axes: dict[tuple[str, str], list[str]] = {
+        axis_linked_account: [i["Id"] for i in org_accounts_active],
+        axis_project_name: tags_meta[tag_project_name],
+        axis_env_type: tags_meta[tag_env_type],
+    }
+    # In incremental mode, only query the months which are missing from the (on-disk) cache, or are still open
+    results_by_time_cache: dict[str, dict[str, dict]] = load_results_by_time_cache(region) if incremental else None
+    group_by_axis, filter_axes, filter_values_list = get_ce_query_plan(
+        axes, preferred_group_by_axis=get_cached_group_by_axis(results_by_time_cache)
+    )
+    logger.info(
+        f"## Retrieves cost and usage metrics, grouped by: '{group_by_axis[1]}' (and service), "
+        f"in {len(filter_values_list)} queries, filtered on: {[i[1] for i in filter_axes]}"
+    )
+    ce_get_cost_and_usage_res, errors = cf.fan_out(
+        partial(
+            get_ce_cost_and_usage_grouped,
+            clients[aws.ce_str],
+            lambda: cf.write_to_json_paths(res, base_steps_client_names),
+            time_period_meta,
+            group_by_axis,
+            filter_axes,
+            results_by_time_cache,
+        ),
+        filter_values_list,
+        desc="Cost Explorer Get Cost And Usage",
+    )
+    if errors:
+        logger.error(f"## ERROR: Could not retrieve cost and usage metrics, for filter values: {list(errors)}")
+        cf.write_to_json_paths(res, base_steps_client_names)
+        sys.exit(1)
+    if incremental:
+        save_results_by_time_cache(region, results_by_time_cache)
+
+    # (Account ID, project name, env type) -> time period -> service groups
+    time_periods: set[tuple[str, str]] = set()
+    ce_groups_map: dict[tuple[str, str, str], dict[tuple[str, str], list[dict]]] = {}
+    for filter_values, results_by_time in ce_get_cost_and_usage_res.items():
+        for time_period, entry in results_by_time.items():
+            time_periods.add(time_period)
+            for group in entry["Groups"]:
+                # The grouped axis is not filtered on (see 'get_ce_query_plan'), e.g. skip any inactive accounts
+                if (group_value := get_ce_group_value(group_by_axis, group["Keys"][0])) not in axes[group_by_axis]:
+                    continue
+                axes_values: dict[tuple[str, str], str] = {
+                    **dict(zip(filter_axes, filter_values)),
+                    group_by_axis: group_value,
+                }
+                ce_groups_map.setdefault(tuple(axes_values[i] for i in axes), {}).setdefault(time_period, []).append(
+                    {"Keys": group["Keys"][1:], metric_str: group[metric_str]}
+                )
+
     # pylint: disable=too-many-nested-blocks
     for i, org_account_meta in enumerate(org_list_accounts_list):
         if org_account_meta["Status"] != "ACTIVE":
@@ -127,60 +327,21 @@ def main(region: str, months: int):
         results_timestamp_account_path: str = os.path.join(results_timestamp_path, org_account_name_id)
         Path(results_timestamp_account_path).mkdir()
 
-        res[aws.ce_str][get_cost_and_usage_str][org_account_name_id] = {}
-        time_periods: set[tuple[str, str]] = set()
-        for project_name in tags_meta[tag_project_name]:
-            project_name_sanitised: str = sanitise(project_name)
-            res[aws.ce_str][get_cost_and_usage_str][org_account_name_id][project_name_sanitised] = {}
-            for env_type in tags_meta[tag_env_type]:
-                env_type_sanitised: str = sanitise(env_type)
-                logger.info(
-                    f"## Retrieves cost and usage metrics for: {org_account_prefix} {project_name_sanitised} {env_type_sanitised}"
-                )
-                is_next_token: bool = True
-                next_page_token: str = None
-                ce_get_cost_and_usage_responses: list[dict] = []
-                while is_next_token:
-                    try:
-                        ce_get_cost_and_usage_res = clients[aws.ce_str].get_cost_and_usage(
-                            TimePeriod=time_period_meta,
-                            Granularity="MONTHLY",
-                            Filter={
-                                "And": [
-                                    {i: {"Key": j, "Values": [k], "MatchOptions": ["EQUALS", "CASE_SENSITIVE"]}}
-                                    for i, j, k in [
-                                        ("Dimensions", "LINKED_ACCOUNT", org_account_id),
-                                        ("Tags", tag_project_name, project_name),
-                                        ("Tags", tag_env_type, env_type),
-                                    ]
-                                ],
-                            },
-                            Metrics=[cost_str],
-                            GroupBy=[{"Type": "DIMENSION", "Key": "SERVICE"}],
-                            **{
-                                k: v
-                                for k, v in {
-                                    next_page_token_str: next_page_token if next_page_token else None,
-                                }.items()
-                                if v
-                            },
-                        )
-                        logger.info("## Cost Explorer List Accounts successful response")
-                    except ClientError as ex:
-                        logger.error(f"## Cost Explorer List Accounts ERROR: '{ex}'")
-                        cf.write_to_json_paths(res, base_steps_client_names)
-                        sys.exit(1)
-                    if next_page_token_str in ce_get_cost_and_usage_res:
-                        next_page_token = ce_get_cost_and_usage_res[next_page_token_str]
-                    else:
-                        is_next_token = False
-                    ce_get_cost_and_usage_res_results_by_time = ce_get_cost_and_usage_res["ResultsByTime"]
-                    for account_meta in ce_get_cost_and_usage_res_results_by_time:
-                        time_periods.add(time_period_to_tuple(account_meta[time_period_str]))
-                    ce_get_cost_and_usage_responses += ce_get_cost_and_usage_res_results_by_time
-                res[aws.ce_str][get_cost_and_usage_str][org_account_name_id][project_name_sanitised][
-                    env_type_sanitised
-                ] = ce_get_cost_and_usage_responses
+        res[aws.ce_str][get_cost_and_usage_str][org_account_name_id] = {
+            sanitise(project_name): {
+                sanitise(env_type): [
+                    {
+                        time_period_str: {start_str: start_time, end_str: end_time},
+                        "Groups": ce_groups_map.get((org_account_id, project_name, env_type), {}).get(
+                            (start_time, end_time), []
+                        ),
+                    }
+                    for start_time, end_time in sorted(time_periods)
+                ]
+                for env_type in tags_meta[tag_env_type]
+            }
+            for project_name in tags_meta[tag_project_name]
+        }
 
         for start_time, end_time in sorted(time_periods):
             results_timestamp_account_start_end_time_path: str = os.path.join(
@@ -262,5 +423,11 @@ if __name__ == "__main__":
         help="Specify the number of months to collect cost and usage for, eg. '--months 6'.",
         type=str,
     )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Optionally, only query the months which are missing or still open since the last '--incremental' run, "
+        "re-using the (on-disk) cost and usage of all other (closed) months.",
+    )
     args = parser.parse_args()
-    main(region="us-east-1", months=args.months)
+    main(region="us-east-1", months=args.months, incremental=args.incremental)
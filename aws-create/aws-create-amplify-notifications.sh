@@ -48,7 +48,7 @@ main() {
   FILENAME_BASE="aws-create-amplify"
   PY_FILE="${FILENAME_BASE}.py"
   FILENAME="${FILENAME_BASE}-notifications"
-  AMPLIFY_RES="${FILENAME}-amplify-res.json"
+  AMPLIFY_RES="${FILENAME}-amplify-res.ndjson"
 
   EXAMPLE_DESC_REGION="For example: -r \"eu-west-2\""
   EXAMPLE_DESC_GIT_REPO="For example: -g \"git-repo-name\""
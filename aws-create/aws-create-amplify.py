@@ -293,7 +293,9 @@ def oauth_steps(region: str) -> None:
 def notifications_steps(region: str, repo: str, deploy_env: str) -> None:
     amplify = cf.get_client(region, aws.amplify_str)
 
-    clients, res = cf.get_clients_and_res_objs(region, notifications_steps_client_names)
+    clients, res = cf.get_clients_and_res_objs(
+        region, notifications_steps_client_names, json_paths_key=notifications_str
+    )
 
     amplify_app_name: str = f"{repo}-{deploy_env}"
 
@@ -312,11 +314,9 @@ def notifications_steps(region: str, repo: str, deploy_env: str) -> None:
     amplify_app_id, amplify_app_tags = cf.get_amplify_app_id_and_tags(amplify, amplify_app_name)
     amplify_app_tags_formatted: list[dict[str, str]] = [{"Key": k, "Value": v} for k, v in amplify_app_tags.items()]
 
-    sns_list_topics_res_topics: list[dict] = cf.sns_list_topics(clients[aws.sns_str])
-
     logger.info(f"## Get the SNS topic ARN (for the AWS Amplify app ID: '{amplify_app_id}')")
     topic_arn: str = None
-    for i in sns_list_topics_res_topics:
+    for i in cf.sns_list_topics(clients[aws.sns_str]):
         if amplify_app_id in i["TopicArn"]:
             topic_arn = i["TopicArn"]
             break
@@ -401,36 +401,27 @@ def notifications_steps(region: str, repo: str, deploy_env: str) -> None:
             cf.write_to_json_paths(res, notifications_steps_client_names, json_paths_key=notifications_str)
             sys.exit(1)
 
-    is_next_token = True
-    next_token = None
-    events_list_rules_res_rules: list = []
-    while is_next_token:
-        try:
-            events_list_rules_res = clients[aws.events_str].list_rules(
-                **{
-                    k: v
-                    for k, v in {
-                        "NamePrefix": "amplify-",
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
+    events_rule_arn: str = next(
+        (
+            i["Arn"]
+            for i in cf.paginate(
+                clients[aws.events_str].list_rules,
+                "Rules",
+                "EventBridge List Rules",
+                on_error=lambda: cf.write_to_json_paths(
+                    res, notifications_steps_client_names, json_paths_key=notifications_str
+                ),
+                NamePrefix="amplify-",
             )
-            logger.info("## EventBridge List Rules successful response")
-        except ClientError as ex:
-            logger.error(f"## EventBridge List Rules ERROR: '{ex}'")
-            cf.write_to_json_paths(res, notifications_steps_client_names, json_paths_key=notifications_str)
-            sys.exit(1)
-        if "NextToken" in events_list_rules_res:
-            next_token = events_list_rules_res["NextToken"]
-        else:
-            is_next_token = False
-        events_list_rules_res_rules += events_list_rules_res["Rules"]
+            if amplify_app_id in i["Arn"]
+        ),
+        None,
+    )
 
     logger.info("## Adding AWS Amplify app tags to EventBridge rule")
     try:
         res[aws.events_str]["events_tag_resource"] = clients[aws.events_str].tag_resource(
-            ResourceARN=[i["Arn"] for i in events_list_rules_res_rules if amplify_app_id in i["Arn"]][0],
+            ResourceARN=events_rule_arn,
             Tags=amplify_app_tags_formatted,
         )
         logger.info("## EventBridge Tag Resource successful response")
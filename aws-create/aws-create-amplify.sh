@@ -81,7 +81,7 @@ main() {
   AWS_AMPLIFY="aws-amplify"
   FILENAME="aws-create-amplify"
   PY_FILE="${FILENAME}.py"
-  AMPLIFY_RES="${FILENAME}-amplify-res.json"
+  AMPLIFY_RES="${FILENAME}-amplify-res.ndjson"
   OAUTH_TOKEN_CURL_CMD_FILE="${FILENAME}-oauth-token-curl-cmd.txt"
 
   EXAMPLE_DESC_REGION="For example: -r \"eu-west-2\""
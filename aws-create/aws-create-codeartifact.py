@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+from typing import Iterator
 
 from botocore.exceptions import ClientError
 
@@ -26,76 +27,26 @@ codeartifact_default_domain: str = "foobar"
 
 def check_domain_exists(codeartifact, codeartifact_domain: str) -> bool:
     logger.info(f"## Checking whether there is already a CodeArtifact domain of the name: '{codeartifact_domain}'")
-    for name in [i["name"] for i in codeartifact_list_domains(codeartifact)]:
-        if name == codeartifact_domain:
-            return True
-    return False
+    return any(i["name"] == codeartifact_domain for i in codeartifact_list_domains(codeartifact))
 
 
 def check_repository_exists(codeartifact, codeartifact_repository: str) -> bool:
     logger.info(
         f"## Checking whether there is already a CodeArtifact repository of the name: '{codeartifact_repository}'"
     )
-    for name in [i["name"] for i in codeartifact_list_repositories(codeartifact)]:
-        if name == codeartifact_repository:
-            return True
-    return False
+    return any(i["name"] == codeartifact_repository for i in codeartifact_list_repositories(codeartifact))
 
 
-def codeartifact_list_domains(codeartifact) -> list[dict]:
+def codeartifact_list_domains(codeartifact) -> Iterator[dict]:
     logger.info("## List all CodeArtifact domains")
-    is_next_token: bool = True
-    next_token: str = None
-    codeartifact_list_domains_res_domains: list = []
-    while is_next_token:
-        try:
-            codeartifact_list_domains_res = codeartifact.list_domains(
-                **{
-                    k: v
-                    for k, v in {
-                        "nextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## CodeArtifact List Domains successful response")
-        except ClientError as ex:
-            logger.error(f"## CodeArtifact List Domains ERROR: '{ex}'")
-            sys.exit(1)
-        if "nextToken" in codeartifact_list_domains_res:
-            next_token = codeartifact_list_domains_res["nextToken"]
-        else:
-            is_next_token = False
-        codeartifact_list_domains_res_domains += codeartifact_list_domains_res["domains"]
-    return codeartifact_list_domains_res_domains
-
-
-def codeartifact_list_repositories(codeartifact) -> list[dict]:
+    return cf.paginate(codeartifact.list_domains, "domains", "CodeArtifact List Domains", token_key="nextToken")
+
+
+def codeartifact_list_repositories(codeartifact) -> Iterator[dict]:
     logger.info("## List all CodeArtifact repositories")
-    is_next_token: bool = True
-    next_token: str = None
-    codeartifact_list_repositories_res_repositories: list = []
-    while is_next_token:
-        try:
-            codeartifact_list_repositories_res = codeartifact.list_repositories(
-                **{
-                    k: v
-                    for k, v in {
-                        "nextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## CodeArtifact List Repositories successful response")
-        except ClientError as ex:
-            logger.error(f"## CodeArtifact List Repositories ERROR: '{ex}'")
-            sys.exit(1)
-        if "nextToken" in codeartifact_list_repositories_res:
-            next_token = codeartifact_list_repositories_res["nextToken"]
-        else:
-            is_next_token = False
-        codeartifact_list_repositories_res_repositories += codeartifact_list_repositories_res["repositories"]
-    return codeartifact_list_repositories_res_repositories
+    return cf.paginate(
+        codeartifact.list_repositories, "repositories", "CodeArtifact List Repositories", token_key="nextToken"
+    )
 
 
 def main(
@@ -2,6 +2,7 @@ import json
 import logging
 import os
 import sys
+from typing import Iterator
 
 from botocore.exceptions import ClientError
 
@@ -28,12 +29,10 @@ def check_platform_application_exists(sns, sns_platform_application_name: str) -
         f"## Checking whether there is already an SNS platform application "
         f"of the name: '{sns_platform_application_name}'"
     )
-    for name in [
-        i["PlatformApplicationArn"].rsplit(sep="/", maxsplit=1)[-1] for i in sns_list_platform_applications(sns)
-    ]:
-        if name == sns_platform_application_name:
-            return True
-    return False
+    return any(
+        i["PlatformApplicationArn"].rsplit(sep="/", maxsplit=1)[-1] == sns_platform_application_name
+        for i in sns_list_platform_applications(sns)
+    )
 
 
 def get_cdk_stack_outputs_and_tags(
@@ -103,34 +102,9 @@ def get_cdk_stack_outputs_and_tags(
     return sns_topic_arn, iam_role_arn, cdk_stack_meta["Tags"]
 
 
-def sns_list_platform_applications(sns) -> list[dict]:
+def sns_list_platform_applications(sns) -> Iterator[dict]:
     logger.info("## List all SNS platform applications")
-    is_next_token: bool = True
-    next_token: str = None
-    sns_list_platform_applications_res_platform_applications: list = []
-    while is_next_token:
-        try:
-            sns_list_platform_applications_res = sns.list_platform_applications(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## SNS List Platform Applications successful response")
-        except ClientError as ex:
-            logger.error(f"## SNS List Platform Applications ERROR: '{ex}'")
-            sys.exit(1)
-        if "NextToken" in sns_list_platform_applications_res:
-            next_token = sns_list_platform_applications_res["NextToken"]
-        else:
-            is_next_token = False
-        sns_list_platform_applications_res_platform_applications += sns_list_platform_applications_res[
-            "PlatformApplications"
-        ]
-    return sns_list_platform_applications_res_platform_applications
+    return cf.paginate(sns.list_platform_applications, "PlatformApplications", "SNS List Platform Applications")
 
 
 def main(
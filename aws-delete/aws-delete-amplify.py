@@ -85,11 +85,9 @@ def base_steps(
             sys.exit(1)
         logger.info("## No Basic Auth credentials found ...")
 
-    sns_list_topics_res_topics: list[dict] = cf.sns_list_topics(clients[aws.sns_str])
-
     logger.info(f"## Get the SNS topic ARN (for the AWS Amplify app ID: '{amplify_app_id}')")
     topic_arn: str = None
-    for i in sns_list_topics_res_topics:
+    for i in cf.sns_list_topics(clients[aws.sns_str]):
         if amplify_app_id in i["TopicArn"]:
             topic_arn = i["TopicArn"]
             break
@@ -137,34 +135,14 @@ def base_steps(
             sys.exit(1)
 
     logger.info(f"## Clearing up CloudWatch alarms (for AWS Amplify app: '{amplify_app_name}')")
-    is_next_token: bool = True
-    next_token: str = None
-    cloudwatch_describe_alarms_responses: list = []
-    while is_next_token:
-        try:
-            cloudwatch_describe_alarms_res = clients[aws.cloudwatch_str].describe_alarms(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                        "MaxRecords": 100,  # Max 100. Default: 50
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## CloudWatch Describe Alarms successful response")
-        except ClientError as ex:
-            logger.error(
-                f"## CloudWatch Describe Alarms ERROR: '{ex}', in trying to delete CloudWatch alarms "
-                f"(for AWS Amplify app: '{amplify_app_name}')"
-            )
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        cloudwatch_describe_alarms_responses.append(cloudwatch_describe_alarms_res)
-        if "NextToken" in cloudwatch_describe_alarms_res:
-            next_token = cloudwatch_describe_alarms_res["NextToken"]
-        else:
-            is_next_token = False
+    cloudwatch_describe_alarms_responses: list = list(
+        cf.paginate_pages(
+            clients[aws.cloudwatch_str].describe_alarms,
+            "CloudWatch Describe Alarms",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+            MaxRecords=100,  # Max 100. Default: 50
+        )
+    )
     res[aws.cloudwatch_str]["cloudwatch_describe_alarms"] = cloudwatch_describe_alarms_responses
     cloudwatch_alarms_to_be_deleted: list = []
     for i in cloudwatch_describe_alarms_responses:
@@ -189,38 +167,23 @@ def base_steps(
             "cloudwatch_delete_alarms_res": cloudwatch_delete_alarms_res,
         }
 
-    is_next_token = True
-    next_token = None
-    events_list_rules_res_rules: list = []
-    while is_next_token:
-        try:
-            events_list_rules_res = clients[aws.events_str].list_rules(
-                **{
-                    k: v
-                    for k, v in {
-                        "NamePrefix": "amplify-",
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## EventBridge List Rules successful response")
-        except ClientError as ex:
-            logger.error(f"## EventBridge List Rules ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        if "NextToken" in events_list_rules_res:
-            next_token = events_list_rules_res["NextToken"]
-        else:
-            is_next_token = False
-        events_list_rules_res_rules += events_list_rules_res["Rules"]
-
     logger.info(
         f"## Clearing up the EventBridge rule, and all it's targets (for AWS Amplify app: '{amplify_app_name}')"
     )
     is_events_managed_rule: bool = True
-    if (events_rule_names := [i["Name"] for i in events_list_rules_res_rules if amplify_app_id in i["Name"]]) and (
-        events_rule_name := events_rule_names[0]
+    if events_rule_name := next(
+        (
+            i["Name"]
+            for i in cf.paginate(
+                clients[aws.events_str].list_rules,
+                "Rules",
+                "EventBridge List Rules",
+                on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+                NamePrefix="amplify-",
+            )
+            if amplify_app_id in i["Name"]
+        ),
+        None,
     ):
         try:
             res[aws.events_str]["events_list_targets_by_rule"] = clients[aws.events_str].list_targets_by_rule(
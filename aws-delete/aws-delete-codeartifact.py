@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+from typing import Iterator
 
 from botocore.exceptions import ClientError
 
@@ -28,38 +29,14 @@ def check_repository_exists(codeartifact, codeartifact_repository: str) -> bool:
     logger.info(
         f"## Checking whether there is already a CodeArtifact repository of the name: '{codeartifact_repository}'"
     )
-    for name in [i["name"] for i in codeartifact_list_repositories(codeartifact)]:
-        if name == codeartifact_repository:
-            return True
-    return False
+    return any(i["name"] == codeartifact_repository for i in codeartifact_list_repositories(codeartifact))
 
 
-def codeartifact_list_repositories(codeartifact) -> list[dict]:
+def codeartifact_list_repositories(codeartifact) -> Iterator[dict]:
     logger.info("## List all CodeArtifact repositories")
-    is_next_token: bool = True
-    next_token: str = None
-    codeartifact_list_repositories_res_repositories: list = []
-    while is_next_token:
-        try:
-            codeartifact_list_repositories_res = codeartifact.list_repositories(
-                **{
-                    k: v
-                    for k, v in {
-                        "nextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## CodeArtifact List Repositories successful response")
-        except ClientError as ex:
-            logger.error(f"## CodeArtifact List Repositories ERROR: '{ex}'")
-            sys.exit(1)
-        if "nextToken" in codeartifact_list_repositories_res:
-            next_token = codeartifact_list_repositories_res["nextToken"]
-        else:
-            is_next_token = False
-        codeartifact_list_repositories_res_repositories += codeartifact_list_repositories_res["repositories"]
-    return codeartifact_list_repositories_res_repositories
+    return cf.paginate(
+        codeartifact.list_repositories, "repositories", "CodeArtifact List Repositories", token_key="nextToken"
+    )
 
 
 def main(
@@ -1,6 +1,7 @@
 import logging
 import os
 import sys
+from typing import Iterator
 
 from botocore.exceptions import ClientError
 
@@ -27,40 +28,15 @@ def check_platform_application_exists(sns, sns_platform_application_name: str) -
         f"## Checking whether there is already an SNS platform application "
         f"of the name: '{sns_platform_application_name}'"
     )
-    for arn in [i["PlatformApplicationArn"] for i in sns_list_platform_applications(sns)]:
+    for arn in (i["PlatformApplicationArn"] for i in sns_list_platform_applications(sns)):
         if (name := arn.rsplit(sep="/", maxsplit=1)[-1]) and name == sns_platform_application_name:
             return arn
     return None
 
 
-def sns_list_platform_applications(sns) -> list[dict]:
+def sns_list_platform_applications(sns) -> Iterator[dict]:
     logger.info("## List all SNS platform applications")
-    is_next_token: bool = True
-    next_token: str = None
-    sns_list_platform_applications_res_platform_applications: list = []
-    while is_next_token:
-        try:
-            sns_list_platform_applications_res = sns.list_platform_applications(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## SNS List Platform Applications successful response")
-        except ClientError as ex:
-            logger.error(f"## SNS List Platform Applications ERROR: '{ex}'")
-            sys.exit(1)
-        if "NextToken" in sns_list_platform_applications_res:
-            next_token = sns_list_platform_applications_res["NextToken"]
-        else:
-            is_next_token = False
-        sns_list_platform_applications_res_platform_applications += sns_list_platform_applications_res[
-            "PlatformApplications"
-        ]
-    return sns_list_platform_applications_res_platform_applications
+    return cf.paginate(sns.list_platform_applications, "PlatformApplications", "SNS List Platform Applications")
 
 
 def main(
@@ -74,25 +74,18 @@ def base_amplify_steps(
     amplify_app_name: str = f"{repo}-{deploy_env}"
 
     logger.info(f"## Getting the AWS Amplify app ID (for AWS Amplify app: '{amplify_app_name}')")
-    amplify_list_apps_res: list[dict] = cf.amplify_list_apps(clients[aws.amplify_str])
-    amplify_app_id: str = None
-    index: int = None
-    for n, (name, app_id) in enumerate({i["name"]: i["appId"] for i in amplify_list_apps_res}.items()):
-        if name == amplify_app_name:
-            amplify_app_id = app_id
-            index = n
-            break
-    if amplify_app_id is None:
-        logger.error(f"## AWS Amplify List Apps res: '{amplify_list_apps_res}'")
+    amplify_app: dict = cf.get_amplify_app(clients[aws.amplify_str], amplify_app_name)
+    if amplify_app is None:
         logger.error(
             f"## ERROR: Could not find AWS Amplify app ID, will NOT deploy (release) "
             f"changes on AWS Amplify app build pipeline: {amplify_app_name}"
         )
         cf.write_to_json_paths(res, client_names)
         sys.exit(1)
+    amplify_app_id: str = amplify_app["appId"]
     logger.info(f"## AWS Amplify app ID: {amplify_app_id} (for AWS Amplify app: '{amplify_app_name}')")
 
-    amplify_app_env_vars = amplify_list_apps_res[index]["environmentVariables"]
+    amplify_app_env_vars = dict(amplify_app["environmentVariables"])
     deploy_tag_var: str = "DEPLOY_TAG"
     amplify_app_env_vars[deploy_tag_var] = tag
 
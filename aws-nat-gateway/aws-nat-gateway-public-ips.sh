@@ -23,21 +23,52 @@ function main() {
     CDK_STACK="CdkVpcSihStack" # The CDK stack name, where VPCs are created
 
     printf "## Generating NAT Gateway Public IPs list...\n\n"
+    # Look up each region concurrently (in a background job per region), each writing its output and NAT Gateway
+    #  Public IPs to temp files, which are then read back in region order (so the output ordering is deterministic).
+    #  PIDs and temp files are kept in indexed (parallel) arrays, in ALL_REGIONS order, as associative arrays need
+    #  bash >= 4 (macOS ships bash 3.2).
+    TMP_DIR="$(mktemp -d)"
+    trap 'rm -rf "${TMP_DIR}"' EXIT
+    PIDS=()
+    LOG_FILES=()
+    IPS_FILES=()
+    for R in "${ALL_REGIONS[@]}"; do
+      LOG_FILE="${TMP_DIR}/${R}.log"
+      IPS_FILE="${TMP_DIR}/${R}.ips"
+      (
+        echo "Region: ${R}"
+        for V in "${ALL_VPC_NAMES[@]}"; do
+          echo "VPC name: ${V}"
+          if IGW_ID=$(aws ssm get-parameter --region "${R}" --name "/${CDK_STACK}/${V}/igw-id" --with-decryption --query "Parameter.Value" --output text --profile "${PROFILE}" 2>/dev/null); then
+            VPC_ID="$(aws ec2 describe-internet-gateways --region "${R}" --filters "Name=internet-gateway-id,Values=${IGW_ID}" --query "InternetGateways[0].Attachments[0].VpcId" --output text --profile "${PROFILE}")"
+            NGW_PUBLIC_IP="$(aws ec2 describe-nat-gateways --region "${R}" --filter "Name=vpc-id,Values=${VPC_ID}" --query "NatGateways[0].NatGatewayAddresses[0].PublicIp" --output text --profile "${PROFILE}")"
+            echo "${NGW_PUBLIC_IP}" >>"${IPS_FILE}"
+            printf "Found NAT Gateway Public IP address: %s (Region: %s, VPC name: %s)\n" "${NGW_PUBLIC_IP}" "${R}" "${V}"
+          fi
+        done
+        echo ""
+      ) >"${LOG_FILE}" 2>&1 &
+      PIDS+=($!)
+      LOG_FILES+=("${LOG_FILE}")
+      IPS_FILES+=("${IPS_FILE}")
+    done
+
     DELIM=""
     NGW_PUBLIC_IPS=""
-    for R in "${ALL_REGIONS[@]}"; do
-      echo "Region: ${R}"
-      for V in "${ALL_VPC_NAMES[@]}"; do
-        echo "VPC name: ${V}"
-        if IGW_ID=$(aws ssm get-parameter --region "${R}" --name "/${CDK_STACK}/${V}/igw-id" --with-decryption --query "Parameter.Value" --output text --profile "${PROFILE}" 2>/dev/null); then
-          VPC_ID="$(aws ec2 describe-internet-gateways --region "${R}" --filters "Name=internet-gateway-id,Values=${IGW_ID}" --query "InternetGateways[0].Attachments[0].VpcId" --output text --profile "${PROFILE}")"
-          NGW_PUBLIC_IP="$(aws ec2 describe-nat-gateways --region "${R}" --filter "Name=vpc-id,Values=${VPC_ID}" --query "NatGateways[0].NatGatewayAddresses[0].PublicIp" --output text --profile "${PROFILE}")"
+    for I in "${!ALL_REGIONS[@]}"; do
+      R="${ALL_REGIONS[${I}]}"
+      if ! wait "${PIDS[${I}]}"; then
+        cat 1>&2 "${LOG_FILES[${I}]}"
+        echo 1>&2 "## ERROR: Failed to generate NAT Gateway Public IPs list (Region: ${R})"
+        exit 1
+      fi
+      cat "${LOG_FILES[${I}]}"
+      if [[ -f "${IPS_FILES[${I}]}" ]]; then
+        while read -r NGW_PUBLIC_IP; do
           NGW_PUBLIC_IPS="${NGW_PUBLIC_IPS}${DELIM}${NGW_PUBLIC_IP}"
           DELIM=","
-          printf "Found NAT Gateway Public IP address: %s (Region: %s, VPC name: %s)\n" "${NGW_PUBLIC_IP}" "${R}" "${V}"
-        fi
-      done
-      echo ""
+        done <"${IPS_FILES[${I}]}"
+      fi
     done
 
     echo "## Put the NAT Gateway Public IPs in AWS Systems Manager Parameter Store (Region: ${REGION})"
@@ -25,66 +25,73 @@ cdk_stack: str = "CdkOpenvpnVpnServerStack"
 delim: str = ","
 
 
-def main(region: str):
-    cf.info_log_starting()
+def get_nlb_public_ipv4_addresses(r: str) -> list[str]:
+    cloudformation = cf.get_client(r, aws.cloudformation_str)
+    ec2 = cf.get_client(r, aws.ec2_str)
 
-    all_nlb_public_ipv4_addresses_list: list[str] = []
+    logger_info_prefix: str = f"(Region: {r})"
 
-    for r, _ in cf.region_timezones_meta.items():
-        cloudformation = cf.get_client(r, aws.cloudformation_str)
-        ec2 = cf.get_client(r, aws.ec2_str)
+    logger.info(
+        f"## {logger_info_prefix} Retrieving OpenVPN Server NLB DNS name from the '{cdk_stack}' "
+        f"(AWS CDK) stack CloudFormation output"
+    )
 
-        logger_info_prefix: str = f"(Region: {r})"
+    try:
+        cloudformation_describe_stacks_res = cloudformation.describe_stacks(StackName=cdk_stack)
+        logger.info(f"## {logger_info_prefix} CloudFormation Describe Stacks successful response")
+    except ClientError as ex:
+        logger.error(f"## {logger_info_prefix} CloudFormation Describe Stacks ERROR: '{ex}'")
+        return []
+
+    cdk_stack_name_outputs: list[dict[str, str]] = cloudformation_describe_stacks_res["Stacks"][0]["Outputs"]
+    nlb_dns_name: str = None
+    cdk_stack_output_key_snippet: str = f"{cdk_stack[len('Cdk'): -(len('Stack'))].lower()}nlbdnsname"
+    for i in cdk_stack_name_outputs:
+        if cdk_stack_output_key_snippet in i["OutputKey"]:
+            nlb_dns_name = i["OutputValue"]
+            break
+    if nlb_dns_name is None:
+        logger.error(
+            f"## {logger_info_prefix} CloudFormation Describe Stacks outputs: {cdk_stack_name_outputs} "
+            f"(for '{cdk_stack}' (AWS CDK) stack)"
+        )
+        logger.error(
+            f"## {logger_info_prefix} ERROR: Could not find output key starting with: '{cdk_stack_output_key_snippet}' "
+            f"(from the '{cdk_stack}' (AWS CDK) stack CloudFormation output)"
+        )
+        sys.exit(1)
 
-        logger.info(
-            f"## {logger_info_prefix} Retrieving OpenVPN Server NLB DNS name from the '{cdk_stack}' "
-            f"(AWS CDK) stack CloudFormation output"
+    nlb_name: str
+    nlb_id: str
+    nlb_name, nlb_id = nlb_dns_name.split(sep=".", maxsplit=1)[0].rsplit(sep="-", maxsplit=1)
+    try:
+        ec2_describe_network_interfaces_res = ec2.describe_network_interfaces(
+            Filters=[
+                {"Name": "interface-type", "Values": ["network_load_balancer"]},
+                {"Name": "description", "Values": [f"ELB net/{nlb_name}/{nlb_id}"]},
+            ],
         )
+        logger.info(f"## {logger_info_prefix} EC2 Describe Network Interfaces successful response")
+    except ClientError as ex:
+        logger.error(f"## {logger_info_prefix} EC2 Describe Network Interfaces ERROR: '{ex}'")
+        sys.exit(1)
+
+    return [
+        network_interface["Association"]["PublicIp"]
+        for network_interface in ec2_describe_network_interfaces_res["NetworkInterfaces"]
+    ]
+
+
+def main(region: str):
+    cf.info_log_starting()
+
+    nlb_public_ipv4_addresses: dict[str, list[str]]
+    nlb_public_ipv4_addresses, errors = cf.fan_out_regions(get_nlb_public_ipv4_addresses)
+    if errors:
+        logger.error(f"## ERROR: Could not retrieve OpenVPN Server NLB Public IPs, in AWS regions: {list(errors)}")
+        sys.exit(1)
 
-        try:
-            cloudformation_describe_stacks_res = cloudformation.describe_stacks(StackName=cdk_stack)
-            logger.info(f"## {logger_info_prefix} CloudFormation Describe Stacks successful response")
-        except ClientError as ex:
-            logger.error(f"## {logger_info_prefix} CloudFormation Describe Stacks ERROR: '{ex}'")
-            continue
-
-        cdk_stack_name_outputs: list[dict[str, str]] = cloudformation_describe_stacks_res["Stacks"][0]["Outputs"]
-        nlb_dns_name: str = None
-        cdk_stack_output_key_snippet: str = f"{cdk_stack[len('Cdk'): -(len('Stack'))].lower()}nlbdnsname"
-        for i in cdk_stack_name_outputs:
-            if cdk_stack_output_key_snippet in i["OutputKey"]:
-                nlb_dns_name = i["OutputValue"]
-                break
-        if nlb_dns_name is None:
-            logger.error(
-                f"## {logger_info_prefix} CloudFormation Describe Stacks outputs: {cdk_stack_name_outputs} "
-                f"(for '{cdk_stack}' (AWS CDK) stack)"
-            )
-            logger.error(
-                f"## {logger_info_prefix} ERROR: Could not find output key starting with: '{cdk_stack_output_key_snippet}' "
-                f"(from the '{cdk_stack}' (AWS CDK) stack CloudFormation output)"
-            )
-            sys.exit(1)
-
-        nlb_name: str
-        nlb_id: str
-        nlb_name, nlb_id = nlb_dns_name.split(sep=".", maxsplit=1)[0].rsplit(sep="-", maxsplit=1)
-        try:
-            ec2_describe_network_interfaces_res = ec2.describe_network_interfaces(
-                Filters=[
-                    {"Name": "interface-type", "Values": ["network_load_balancer"]},
-                    {"Name": "description", "Values": [f"ELB net/{nlb_name}/{nlb_id}"]},
-                ],
-            )
-            logger.info(f"## {logger_info_prefix} EC2 Describe Network Interfaces successful response")
-        except ClientError as ex:
-            logger.error(f"## {logger_info_prefix} EC2 Describe Network Interfaces ERROR: '{ex}'")
-            sys.exit(1)
-
-        all_nlb_public_ipv4_addresses_list = all_nlb_public_ipv4_addresses_list + [
-            network_interface["Association"]["PublicIp"]
-            for network_interface in ec2_describe_network_interfaces_res["NetworkInterfaces"]
-        ]
+    all_nlb_public_ipv4_addresses_list: list[str] = [ip for ips in nlb_public_ipv4_addresses.values() for ip in ips]
 
     clients, res = cf.get_clients_and_res_objs(region, base_steps_client_names)
 
@@ -63,13 +63,13 @@ main() {
   fi
 
   printf "%s\n\n" "## Collecting '${JSON_FILE}' data using '${PY_FILE}' script"
-  python3 ${PY_FILE} --region "${REGION}" --ecs
+  python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --ecs
 
   if [[ "${LIST}" -eq 1 ]]; then
-    python3 ${PY_FILE} --region "${REGION}" --list --ecs
+    python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --list --ecs
   else
     printf "%s\n\n" "## Collecting '${ECS_CLUSTER_FILE}' data using '${PY_FILE}' script"
-    python3 ${PY_FILE} --region "${REGION}" --cluster "$1"
+    python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --cluster "$1"
 
     ECS_CLUSTER_ARN="$(cat ${ECS_CLUSTER_FILE})"
     printf "%s\n\n" "## ECS Cluster ARN: ${ECS_CLUSTER_ARN}"
@@ -146,7 +146,7 @@ def base_steps(region: str, ecs: bool) -> None:
         project_count[project_name] = n
         project_local_port_offset[project_name] = 0
     for parameter_name in sorted(
-        jmespath.compile("[].Name").search(cf.ssm_describe_parameters(ssm, contains=parameter_prefix))
+        jmespath.compile("[].Name").search(list(cf.ssm_describe_parameters(ssm, contains=parameter_prefix)))
     ):
         if str(parameter_name).startswith(parameter_prefix):
             logger.debug(f"## Parameters name: {parameter_name}")
@@ -82,10 +82,10 @@ main() {
   fi
 
   printf "%s\n\n" "## Collecting '${JSON_FILE}' data using '${PY_FILE}' script"
-  python3 ${PY_FILE} --region "${REGION}"
+  python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}"
 
   if [[ "${LIST}" -eq 1 ]]; then
-    python3 ${PY_FILE} --region "${REGION}" --list
+    python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --list
   else
     if [[ -z "${PEM_FILE_PATH}" ]]; then
       printf "%s\n%s\n%s\n\n" "ERROR: Option '-i' required." "${EXAMPLE_DESC_IDENT}" "${HELP_DESC}" 1>&2
@@ -98,14 +98,14 @@ main() {
     fi
 
     printf "%s\n\n" "## Collecting '${BASTION_AZ_FILE}' and '${BASTION_ID_FILE}' data using '${PY_FILE}' script"
-    python3 ${PY_FILE} --region "${REGION}" --bastion
+    python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --bastion
 
     if test -f ${COMMAND_FILE}; then
       rm ${COMMAND_FILE}
     fi
 
     printf "%s\n\n" "## Collecting '${COMMAND_FILE}' data using '${PY_FILE}' script"
-    python3 ${PY_FILE} --region "${REGION}" --command "$@"
+    python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --command "$@"
 
     BASTION_HOST_AZ="$(cat ${BASTION_AZ_FILE})"
     BASTION_HOST_INSTANCE_ID="$(cat ${BASTION_ID_FILE})"
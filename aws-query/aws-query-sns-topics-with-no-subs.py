@@ -29,33 +29,9 @@ def main(region: str):
 
     sns = cf.get_client(region, aws.sns_str)
 
-    is_next_token: bool = True
-    next_token: str = None
-    sns_topic_arns: list[str] = []
-    while is_next_token:
-        try:
-            sns_list_topics_res = sns.list_topics(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## SNS List Topics successful response")
-        except ClientError as ex:
-            logger.error(f"## SNS List Topics ERROR: '{ex}'")
-            sys.exit(1)
-        sns_topic_arns += [i["TopicArn"] for i in sns_list_topics_res["Topics"]]
-        if "NextToken" in sns_list_topics_res:
-            next_token = sns_list_topics_res["NextToken"]
-        else:
-            is_next_token = False
-
     sns_topics_with_no_subs: set[str] = set()
 
-    for sns_topic_arn in sns_topic_arns:
+    for sns_topic_arn in (i["TopicArn"] for i in cf.sns_list_topics(sns)):
         try:
             sns_list_subscriptions_by_topic_res = sns.list_subscriptions_by_topic(TopicArn=sns_topic_arn)
             logger.info(f"## SNS List Subscriptions By Topic successful response: '{sns_topic_arn}'")
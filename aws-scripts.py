@@ -0,0 +1,223 @@
+import json
+import os
+import runpy
+import socket
+import sys
+from contextlib import redirect_stderr, redirect_stdout
+from glob import glob
+
+# Only lightweight modules are imported here: each script (and so boto3, etc.) is imported lazily, only when its
+# subcommand is run. The optional daemon ('serve') keeps those imports, and all cached AWS clients, warm between runs.
+
+repo_path: str = os.path.dirname(os.path.abspath(__file__))
+
+socket_path: str = os.getenv(
+    "AWS_SCRIPTS_SOCKET", os.path.join(os.path.expanduser("~"), ".cache", "aws-scripts-examples", "aws-scripts.sock")
+)
+default_idle_timeout: int = 3600  # Seconds
+
+# Environment variables forwarded (per run) to the daemon
+forwarded_env_prefixes: tuple[str, ...] = ("AWS_",)
+
+serve_str: str = "serve"
+stop_str: str = "stop"
+
+
+def get_scripts() -> dict[str, str]:
+    # Subcommand name (the script filename, without extension) -> script path, e.g. 'aws-private' -> 'aws-private/aws-private.py'
+    return {
+        os.path.basename(path).rsplit(sep=".", maxsplit=1)[0]: path
+        for path in sorted(glob(os.path.join(repo_path, "*", "*.py")))
+        if os.path.basename(os.path.dirname(path)) != "benchmark"
+    }
+
+
+def run_script(path: str, args: list[str]) -> int:
+    argv: list[str] = sys.argv
+    sys_path: list[str] = list(sys.path)
+    sys.argv = [path] + args
+    sys.path.insert(0, repo_path)
+    try:
+        runpy.run_path(path, run_name="__main__")
+        return 0
+    except SystemExit as ex:
+        return ex.code if isinstance(ex.code, int) else (0 if ex.code is None else 1)
+    finally:
+        sys.argv = argv
+        sys.path[:] = sys_path
+
+
+class DaemonStream:
+    # Text stream, forwarding each write to the daemon client, as an NDJSON message
+    def __init__(self, conn: socket.socket, key: str):
+        self.conn = conn
+        self.key = key
+
+    def write(self, s: str) -> int:
+        if s:
+            self.conn.sendall(f"{json.dumps({self.key: s})}\n".encode("utf-8"))
+        return len(s)
+
+    def flush(self):
+        pass
+
+
+class StdoutProxy:
+    # Text stream, writing to whatever 'sys.stdout' currently is (i.e. the current daemon client), for logging handlers
+    def write(self, s: str) -> int:
+        return sys.stdout.write(s)
+
+    def flush(self):
+        sys.stdout.flush()
+
+
+def serve(idle_timeout: int):
+    # pylint: disable=import-outside-toplevel
+    import logging
+    import socketserver
+
+    sys.path.insert(0, repo_path)
+    from common_funcs import CommonFuncs, ResultRecorder
+
+    # Scripts call 'logging.basicConfig', which is a no-op once the root logger has a handler
+    logging.basicConfig(stream=StdoutProxy(), level=logging.INFO)
+
+    class Handler(socketserver.StreamRequestHandler):
+        def handle(self):
+            req: dict = json.loads(self.rfile.readline())
+            if req.get("command") == stop_str:
+                self.server.stopped = True
+                self.wfile.write(f"{json.dumps({'exit': 0})}\n".encode("utf-8"))
+                return
+            cwd: str = os.getcwd()
+            env: dict[str, str] = dict(os.environ)
+            os.environ.update(req["env"])
+            for k in [k for k in env if k.startswith(forwarded_env_prefixes) and k not in req["env"]]:
+                del os.environ[k]
+            CommonFuncs.reset_run_state()
+            code: int = 1
+            try:
+                os.chdir(req["cwd"])
+                with redirect_stdout(DaemonStream(self.connection, "out")), redirect_stderr(
+                    DaemonStream(self.connection, "err")
+                ):
+                    try:
+                        code = run_script(get_scripts()[req["script"]], req["args"])
+                    except Exception:  # pylint: disable=broad-except
+                        logging.exception(f"## ERROR: Running '{req['script']}' failed")
+                    finally:
+                        ResultRecorder.close_all()
+            finally:
+                os.chdir(cwd)
+                os.environ.clear()
+                os.environ.update(env)
+            self.wfile.write(f"{json.dumps({'exit': code})}\n".encode("utf-8"))
+
+    class Server(socketserver.UnixStreamServer):
+        stopped: bool = False
+        timeout: int = idle_timeout
+
+        def handle_timeout(self):
+            self.stopped = True
+
+    os.makedirs(os.path.dirname(socket_path), mode=0o700, exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+    umask: int = os.umask(0o177)  # Only the current user can connect (the daemon runs scripts with their AWS creds)
+    try:
+        server = Server(socket_path, Handler)
+    finally:
+        os.umask(umask)
+    print(f"## Serving on: '{socket_path}' (idle timeout: {idle_timeout}s)")
+    try:
+        # Handle one run at a time, as each run changes the process-wide cwd, env, argv and stdout
+        while not server.stopped:
+            server.handle_request()
+    finally:
+        server.server_close()
+        os.remove(socket_path)
+    print("## Stopped serving")
+
+
+def request(req: dict) -> int:
+    # Returns None if the daemon is not running
+    try:
+        conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        conn.connect(socket_path)
+    except OSError:
+        return None
+    with conn, conn.makefile("r", encoding="utf-8") as f:
+        conn.sendall(f"{json.dumps(req)}\n".encode("utf-8"))
+        for line in f:
+            msg: dict = json.loads(line)
+            if "exit" in msg:
+                return msg["exit"]
+            stream = sys.stdout if "out" in msg else sys.stderr
+            stream.write(msg.get("out", msg.get("err")))
+            stream.flush()
+    print("## ERROR: Lost connection to the daemon", file=sys.stderr)
+    return 1
+
+
+def main(command: str, args: list[str], no_daemon: bool = False, idle_timeout: int = default_idle_timeout) -> int:
+    if command == serve_str:
+        serve(idle_timeout)
+        return 0
+    if command == stop_str:
+        if request({"command": stop_str}) is None:
+            print(f"## No daemon running on: '{socket_path}'")
+        return 0
+    if not no_daemon:
+        code: int = request(
+            {
+                "script": command,
+                "args": args,
+                "cwd": os.getcwd(),
+                "env": {k: v for k, v in os.environ.items() if k.startswith(forwarded_env_prefixes)},
+            }
+        )
+        if code is not None:
+            return code
+    return run_script(get_scripts()[command], args)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Run any script in this git repo as a subcommand (e.g. 'aws-scripts.py aws-private --region "
+        "eu-west-2 --list'), from the directory the script would otherwise be run from. If a daemon is running (see "
+        f"'{serve_str}'), the script is run by the daemon, skipping the per-run Python (and boto3, etc.) start-up."
+    )
+    parser.add_argument(
+        "--no-daemon",
+        action="store_true",
+        help="Optionally, run the script in this process, even if a daemon is running.",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_serve = subparsers.add_parser(
+        serve_str,
+        help=f"Run a long-lived daemon (in the foreground) on a Unix socket: '{socket_path}' (set the "
+        "'AWS_SCRIPTS_SOCKET' env var to override), keeping imports and AWS clients warm between runs.",
+    )
+    parser_serve.add_argument(
+        "--idle-timeout",
+        default=default_idle_timeout,
+        help=f"Optionally, stop the daemon after this many seconds without a run (default: {default_idle_timeout}).",
+        type=int,
+    )
+    subparsers.add_parser(stop_str, help="Stop the daemon.")
+    scripts: dict[str, str] = get_scripts()
+    for name, script_path in scripts.items():
+        subparsers.add_parser(name, help=f"Run '{os.path.relpath(script_path, repo_path)}'.", add_help=False)
+    # Script args (incl. '-h') follow the script subcommand, and are parsed by the script itself
+    n: int = next((n for n, i in enumerate(sys.argv[1:], start=1) if i in scripts), len(sys.argv) - 1)
+    parsed_args = parser.parse_args(sys.argv[1 : n + 1])
+    sys.exit(
+        main(
+            command=parsed_args.command,
+            args=sys.argv[n + 1 :] if parsed_args.command in scripts else [],
+            no_daemon=parsed_args.no_daemon,
+            idle_timeout=getattr(parsed_args, "idle_timeout", default_idle_timeout),
+        )
+    )
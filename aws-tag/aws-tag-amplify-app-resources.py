@@ -29,70 +29,31 @@ def main(region: str):
 
     clients, res = cf.get_clients_and_res_objs(region, base_steps_client_names)
 
-    is_next_token: bool = True
-    next_token: str = None
-    cloudwatch_describe_alarms_responses: list = []
-    while is_next_token:
-        try:
-            cloudwatch_describe_alarms_res = clients[aws.cloudwatch_str].describe_alarms(
-                **{
-                    k: v
-                    for k, v in {
-                        "NextToken": next_token if next_token else None,
-                        "MaxRecords": 100,  # Max 100. Default: 50
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## CloudWatch Describe Alarms successful response")
-        except ClientError as ex:
-            logger.error(f"## CloudWatch Describe Alarms ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        cloudwatch_describe_alarms_responses.append(cloudwatch_describe_alarms_res)
-        if "NextToken" in cloudwatch_describe_alarms_res:
-            next_token = cloudwatch_describe_alarms_res["NextToken"]
-        else:
-            is_next_token = False
+    cloudwatch_describe_alarms_responses: list = list(
+        cf.paginate_pages(
+            clients[aws.cloudwatch_str].describe_alarms,
+            "CloudWatch Describe Alarms",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+            MaxRecords=100,  # Max 100. Default: 50
+        )
+    )
     res[aws.cloudwatch_str]["cloudwatch_describe_alarms"] = cloudwatch_describe_alarms_responses
 
-    is_next_token = True
-    next_token = None
-    events_list_rules_res_rules: list = []
-    while is_next_token:
-        try:
-            events_list_rules_res = clients[aws.events_str].list_rules(
-                **{
-                    k: v
-                    for k, v in {
-                        "NamePrefix": "amplify-",
-                        "NextToken": next_token if next_token else None,
-                    }.items()
-                    if v
-                }
-            )
-            logger.info("## EventBridge List Rules successful response")
-        except ClientError as ex:
-            logger.error(f"## EventBridge List Rules ERROR: '{ex}'")
-            cf.write_to_json_paths(res, base_steps_client_names)
-            sys.exit(1)
-        if "NextToken" in events_list_rules_res:
-            next_token = events_list_rules_res["NextToken"]
-        else:
-            is_next_token = False
-        events_list_rules_res_rules += events_list_rules_res["Rules"]
-
-    events_topics_map = {i["Name"].split(sep="-", maxsplit=2)[1]: i["Arn"] for i in events_list_rules_res_rules}
-
-    sns_list_topics_res_topics: list[dict] = cf.sns_list_topics(clients[aws.sns_str])
-
-    sns_list_topics_res_topics = [
-        i for i in sns_list_topics_res_topics if i["TopicArn"].endswith("AMPLIBRANCHSENTINEL")
-    ]
+    events_topics_map = {
+        i["Name"].split(sep="-", maxsplit=2)[1]: i["Arn"]
+        for i in cf.paginate(
+            clients[aws.events_str].list_rules,
+            "Rules",
+            "EventBridge List Rules",
+            on_error=lambda: cf.write_to_json_paths(res, base_steps_client_names),
+            NamePrefix="amplify-",
+        )
+    }
 
     sns_topics_map = {
         i["TopicArn"].rsplit(sep="_", maxsplit=1)[0].rsplit(sep="-", maxsplit=1)[-1]: i["TopicArn"]
-        for i in sns_list_topics_res_topics
+        for i in cf.sns_list_topics(clients[aws.sns_str])
+        if i["TopicArn"].endswith("AMPLIBRANCHSENTINEL")
     }
 
     res[aws.cloudwatch_str]["cloudwatch_tag_resource"] = {}
@@ -20,3 +20,4 @@ class AwsServiceName:
     secretsmanager_str: str = "secretsmanager"
     sns_str: str = "sns"
     ssm_str: str = "ssm"
+    sts_str: str = "sts"
@@ -0,0 +1,619 @@
+import hashlib
+import importlib.util
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import date, datetime, timedelta, timezone
+from itertools import product
+
+import boto3
+from botocore.awsrequest import AWSResponse
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# pylint: disable=wrong-import-position
+from common_funcs import CommonFuncs
+
+logger = logging.getLogger()
+logging.basicConfig(stream=sys.stdout, level=logging.WARNING)
+
+repo_path: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+account_id: str = "123456789012"
+
+default_sizes: dict[str, int] = {
+    "log_groups": 5000,
+    "stacks": 500,
+    "amplify_apps": 300,
+    "hosted_zones": 50,
+    "certificates": 200,
+    "sns_topics": 500,
+    "ssm_parameters": 200,
+    "accounts": 5,
+}
+
+# Script name -> (script path, function to call, function kwargs)
+scripts_meta: dict[str, tuple[str, str, dict]] = {
+    "aws-clean-up-logs": ("aws-clean-up/aws-clean-up-logs.py", "main", {"region": "eu-west-2"}),
+    "aws-clean-up-dns": ("aws-clean-up/aws-clean-up-dns.py", "main", {"region": "us-east-1"}),
+    "aws-cost-explorer": ("aws-cost-explorer/aws-cost-explorer.py", "main", {"region": "us-east-1", "months": 6}),
+    "aws-tag-amplify-app-resources": ("aws-tag/aws-tag-amplify-app-resources.py", "main", {"region": "eu-west-2"}),
+    "aws-private": ("aws-private/aws-private.py", "base_steps", {"region": "eu-west-2", "ecs": False}),
+    "aws-query-sns-topics-with-no-subs": (
+        "aws-query/aws-query-sns-topics-with-no-subs.py",
+        "main",
+        {"region": "eu-west-2"},
+    ),
+}
+
+
+class FakeAwsError(Exception):
+    def __init__(self, code: str, status_code: int = 400):
+        super().__init__(code)
+        self.code = code
+        self.status_code = status_code
+
+
+def paginate(
+    items: list,
+    params: dict,
+    result_key: str,
+    token_key: str = "NextToken",
+    res_token_key: str = None,
+    limit_key: str = None,
+    default_limit: int = 100,
+    is_truncated_key: str = None,
+) -> dict:
+    # Token is the (stringified) index of the first item of the page
+    start: int = int(params.get(token_key, 0))
+    limit: int = int(params.get(limit_key, default_limit)) if limit_key else default_limit
+    end: int = start + limit
+    res: dict = {result_key: items[start:end]}
+    if end < len(items):
+        res[res_token_key if res_token_key else token_key] = str(end)
+    if is_truncated_key:
+        res[is_truncated_key] = end < len(items)
+    return res
+
+
+class FakeAws:
+    # Synthetic AWS inventories, served in-process (in place of AWS API HTTP requests) via botocore 'before-call' events
+    def __init__(self, sizes: dict[str, int], seed: int = 0):
+        self.sizes = sizes
+        self.calls: int = 0
+        r = random.Random(seed)
+        now: datetime = datetime.now(timezone.utc)
+
+        self.lambda_functions: set[str] = {f"fn-{i}" for i in range(sizes["log_groups"] // 4) if r.random() < 0.5}
+        self.ecs_clusters: set[str] = {f"cluster-{i}" for i in range(sizes["log_groups"] // 4) if r.random() < 0.5}
+        self.rds_instances: set[str] = {f"db-{i}" for i in range(sizes["log_groups"] // 16) if r.random() < 0.5}
+        self.log_groups: list[dict] = []
+        for i in range(sizes["log_groups"]):
+            kind: int = i % 4
+            if kind == 0:
+                name = f"/aws/lambda/fn-{i // 4}"
+            elif kind == 1:
+                name = f"/aws/ecs/containerinsights/cluster-{i // 4}/performance"
+            elif kind == 2:
+                name = f"/aws/rds/instance/db-{i // 16}/{['error', 'general', 'slowquery', 'audit'][(i // 4) % 4]}"
+            else:
+                name = f"/app/log-group-{i // 4}"
+            self.log_groups.append(
+                {
+                    "logGroupName": name,
+                    "creationTime": int((now - timedelta(days=r.randint(0, 1000))).timestamp() * 1000),
+                    "retentionInDays": r.choice([None, 7, 30, 365]),
+                    "metricFilterCount": r.randint(0, 2),
+                    "arn": f"arn:aws:logs:eu-west-2:{account_id}:log-group:{name}:*",
+                    "storedBytes": 0 if r.random() < 0.6 else r.randint(1, 10**10),
+                }
+            )
+        self.log_groups = [{k: v for k, v in i.items() if v is not None} for i in self.log_groups]
+        self.log_groups.sort(key=lambda i: i["logGroupName"])
+
+        self.stacks: list[dict] = []
+        self.stack_resources: dict[str, list[dict]] = {}
+        for i in range(sizes["stacks"]):
+            stack_name: str = f"CdkStack{i}"
+            stack_id: str = f"arn:aws:cloudformation:eu-west-2:{account_id}:stack/{stack_name}/{i}"
+            self.stacks.append(
+                {
+                    "StackName": stack_name,
+                    "StackId": stack_id,
+                    "CreationTime": now - timedelta(days=r.randint(1, 1000)),
+                    "LastUpdatedTime": now - timedelta(days=r.randint(0, 30)),
+                    "StackStatus": "UPDATE_COMPLETE",
+                }
+            )
+            resources: list[dict] = []
+            for j in range(r.randint(5, 40)):
+                resource_type, physical_id = r.choice(
+                    [
+                        ("AWS::Lambda::Function", f"fn-{r.randrange(sizes['log_groups'] // 4)}"),
+                        ("AWS::ECS::Cluster", f"cluster-{r.randrange(sizes['log_groups'] // 4)}"),
+                        ("AWS::RDS::DBInstance", f"db-{r.randrange(sizes['log_groups'] // 16)}"),
+                        ("AWS::Logs::LogGroup", f"/app/log-group-{r.randrange(sizes['log_groups'] // 4)}"),
+                        ("AWS::IAM::Role", f"role-{i}-{j}"),
+                        ("AWS::S3::Bucket", f"bucket-{i}-{j}"),
+                    ]
+                )
+                resources.append(
+                    {
+                        "LogicalResourceId": f"Resource{j}",
+                        "PhysicalResourceId": physical_id,
+                        "ResourceType": resource_type,
+                        "ResourceStatus": "CREATE_COMPLETE",
+                        "LastUpdatedTimestamp": now,
+                    }
+                )
+            self.stack_resources[stack_name] = self.stack_resources[stack_id] = resources
+
+        self.hosted_zones: list[dict] = [
+            {
+                "Id": f"/hostedzone/Z{i:08d}",
+                "Name": f"example-{i}.com.",
+                "Config": {"PrivateZone": i % 10 == 9},
+                "ResourceRecordSetCount": 0,
+            }
+            for i in range(sizes["hosted_zones"])
+        ]
+        self.record_sets: dict[str, list[dict]] = {}
+        for n, zone in enumerate(self.hosted_zones):
+            records: list[dict] = [
+                {"Name": zone["Name"], "Type": "A", "TTL": 300, "ResourceRecords": [{"Value": "192.0.2.1"}]}
+            ]
+            for j in range(200):
+                sub: str = f"{'portal-' if j % 3 == 0 else 'api-'}{j}"
+                records.append(
+                    {
+                        "Name": f"_{hashlib.md5(f'{n}-{j}'.encode()).hexdigest()}.{sub}.{zone['Name']}",
+                        "Type": "CNAME",
+                        "TTL": 300,
+                        "ResourceRecords": [{"Value": f"_{j}.xyz.acm-validations.aws."}],
+                    }
+                )
+            records.sort(key=lambda i: i["Name"])
+            self.record_sets[zone["Id"]] = records
+            self.record_sets[zone["Id"].rsplit(sep="/", maxsplit=1)[-1]] = records
+
+        self.certificates: dict[str, dict] = {}
+        for i in range(sizes["certificates"]):
+            zone = self.hosted_zones[i % len(self.hosted_zones)]
+            records = [k for k in self.record_sets[zone["Id"]] if k["Type"] == "CNAME"]
+            record = records[(i // len(self.hosted_zones)) % len(records)]
+            arn: str = f"arn:aws:acm:us-east-1:{account_id}:certificate/{i:08d}"
+            self.certificates[arn] = {
+                "CertificateArn": arn,
+                "DomainName": record["Name"].split(sep=".", maxsplit=1)[1].rstrip("."),
+                "Status": "ISSUED",
+                "DomainValidationOptions": [
+                    {
+                        "DomainName": record["Name"].split(sep=".", maxsplit=1)[1].rstrip("."),
+                        "ResourceRecord": {
+                            "Name": record["Name"],
+                            "Type": "CNAME",
+                            "Value": record["ResourceRecords"][0]["Value"],
+                        },
+                    }
+                ],
+            }
+
+        regions: list[str] = list(CommonFuncs.region_timezones_meta)
+        self.amplify_apps: dict[str, list[dict]] = {region: [] for region in regions}
+        for i in range(sizes["amplify_apps"]):
+            region: str = regions[i % len(regions)]
+            app_id: str = f"d{hashlib.md5(str(i).encode()).hexdigest()[:13]}"
+            self.amplify_apps[region].append(
+                {
+                    "appId": app_id,
+                    "appArn": f"arn:aws:amplify:{region}:{account_id}:apps/{app_id}",
+                    "name": f"repo-{i}-portal-dev",
+                    "tags": {"project-name": f"project-{i % 5}", "env-type": "dev"},
+                    "environmentVariables": {"DEPLOY_TAG": "v1"},
+                    "domain": self.hosted_zones[i % len(self.hosted_zones)]["Name"].rstrip("."),
+                }
+            )
+
+        self.sns_topics: list[dict] = [
+            {"TopicArn": f"arn:aws:sns:eu-west-2:{account_id}:topic-{i}"} for i in range(sizes["sns_topics"])
+        ] + [
+            {"TopicArn": f"arn:aws:sns:eu-west-2:{account_id}:amplify-{app['appId']}_AMPLIBRANCHSENTINEL"}
+            for app in self.amplify_apps["eu-west-2"]
+        ]
+        self.events_rules: list[dict] = [
+            {
+                "Name": f"amplify-{app['appId']}-rule",
+                "Arn": f"arn:aws:events:eu-west-2:{account_id}:rule/{app['appId']}",
+            }
+            for app in self.amplify_apps["eu-west-2"]
+        ]
+        self.metric_alarms: list[dict] = [
+            {
+                "AlarmName": f"{app['name']}-5xx",
+                "AlarmArn": f"arn:aws:cloudwatch:eu-west-2:{account_id}:alarm:{app['name']}",
+            }
+            for app in self.amplify_apps["eu-west-2"]
+        ]
+
+        self.ssm_parameters: list[dict] = [
+            {"Name": f"/scripts/BastionHostLinux/bastion-eu-west-2{az}"} for az in "abc"
+        ] + [
+            {"Name": f"/scripts/rds-mysql/{['bird', 'cat', 'cow', 'dog', 'fish', 'lion'][i % 6]}-{i}"}
+            for i in range(sizes["ssm_parameters"])
+        ]
+
+        self.accounts: list[dict] = [
+            {"Id": f"{100000000000 + i}", "Name": f"account-{i}", "Status": "ACTIVE" if i % 5 != 4 else "SUSPENDED"}
+            for i in range(sizes["accounts"])
+        ]
+        self.ce_tags: dict[str, list[str]] = {
+            "project-name": [""] + [f"project-{i}" for i in range(5)],
+            "env-type": ["", "dev", "staging", "prod"],
+        }
+        self.ce_services: list[str] = [f"Amazon Service {i}" for i in range(15)]
+
+    def __call__(self, model=None, request_signer=None, context: dict = None, **_) -> tuple[AWSResponse, dict]:
+        # A botocore 'before-call' event handler, returning a response short-circuits the AWS API HTTP request
+        self.calls += 1
+        params: dict = context.get("benchmark_params", {})
+        handler = getattr(self, f"{model.service_model.service_name.replace('-', '_')}_{model.name}", None)
+        try:
+            parsed: dict = handler(request_signer.region_name, params) if handler else {}
+            status_code: int = 200
+        except FakeAwsError as ex:
+            parsed = {"Error": {"Code": ex.code, "Message": ex.code}}
+            status_code = ex.status_code
+        parsed["ResponseMetadata"] = {"HTTPStatusCode": status_code, "RetryAttempts": 0}
+        return AWSResponse(None, status_code, {}, None), parsed
+
+    @staticmethod
+    def stash_params(params: dict = None, context: dict = None, **_):
+        # A botocore 'before-parameter-build' event handler, keeping the (unserialised) AWS API call params
+        context["benchmark_params"] = params
+
+    # --- ACM ---
+
+    def acm_ListCertificates(self, _, params: dict) -> dict:
+        return paginate(
+            [{k: v[k] for k in ["CertificateArn", "DomainName", "Status"]} for v in self.certificates.values()],
+            params,
+            "CertificateSummaryList",
+            limit_key="MaxItems",
+        )
+
+    def acm_DescribeCertificate(self, _, params: dict) -> dict:
+        if params["CertificateArn"] not in self.certificates:
+            raise FakeAwsError("ResourceNotFoundException")
+        return {"Certificate": self.certificates[params["CertificateArn"]]}
+
+    # --- Amplify ---
+
+    def amplify_ListApps(self, region: str, params: dict) -> dict:
+        return paginate(self.amplify_apps.get(region, []), params, "apps", "nextToken", limit_key="maxResults")
+
+    def amplify_ListDomainAssociations(self, region: str, params: dict) -> dict:
+        app: dict = next(i for i in self.amplify_apps[region] if i["appId"] == params["appId"])
+        domain_associations: list[dict] = [
+            {
+                "domainName": app["domain"],
+                "certificateVerificationDNSRecord": (
+                    f"_{hashlib.md5(app['appId'].encode()).hexdigest()}.portal.{app['domain']}. CNAME "
+                    f"_{app['appId']}.xyz.acm-validations.aws."
+                ),
+            }
+        ]
+        return paginate(domain_associations, params, "domainAssociations", "nextToken", limit_key="maxResults")
+
+    # --- Cost Explorer ---
+
+    def ce_GetTags(self, _, params: dict) -> dict:
+        return {"Tags": self.ce_tags[params["TagKey"]], "ReturnSize": 0, "TotalSize": 0}
+
+    def ce_cost_cents(self, month: date, keys: tuple[str, ...]) -> int:
+        # Synthetic (sparse) cost, in cents, per month, linked account, tag values and service
+        h: int = int(hashlib.md5(str((month, keys)).encode()).hexdigest()[:8], 16)
+        return 0 if h % 4 == 0 else h % 100000
+
+    def ce_GetCostAndUsage(self, _, params: dict) -> dict:
+        start: date = date.fromisoformat(params["TimePeriod"]["Start"])
+        end: date = date.fromisoformat(params["TimePeriod"]["End"])
+        # Cost cube dimensions (linked account, each tag, service), filtered by any 'Dimensions'/'Tags' filter values
+        dims: dict[str, list[str]] = {
+            "LINKED_ACCOUNT": [i["Id"] for i in self.accounts],
+            **{k: list(v) for k, v in self.ce_tags.items()},
+            "SERVICE": self.ce_services,
+        }
+        filter_meta: dict = params.get("Filter", {})
+        for i in filter_meta.get("And", [filter_meta]):
+            for k in ["Dimensions", "Tags"]:
+                if k in i:
+                    dims[i[k]["Key"]] = [v for v in dims[i[k]["Key"]] if v in i[k]["Values"]]
+        group_bys: list[dict] = params.get("GroupBy", [])
+        results_by_time: list[dict] = []
+        month: date = start.replace(day=1)
+        while month < end:
+            next_month: date = (month + timedelta(days=32)).replace(day=1)
+            groups: dict[tuple[str, ...], int] = {}
+            for keys in product(*dims.values()):
+                if cents := self.ce_cost_cents(month, keys):
+                    cell: dict[str, str] = dict(zip(dims, keys))
+                    group_keys: tuple[str, ...] = tuple(
+                        f"{i['Key']}${cell[i['Key']]}" if i["Type"] == "TAG" else cell[i["Key"]] for i in group_bys
+                    )
+                    groups[group_keys] = groups.get(group_keys, 0) + cents
+            results_by_time.append(
+                {
+                    "TimePeriod": {"Start": str(max(month, start)), "End": str(min(next_month, end))},
+                    "Total": {},
+                    "Groups": [
+                        {"Keys": list(k), "Metrics": {"UnblendedCost": {"Amount": str(v / 100), "Unit": "USD"}}}
+                        for k, v in groups.items()
+                    ],
+                    "Estimated": False,
+                }
+            )
+            month = next_month
+        return paginate(results_by_time, params, "ResultsByTime", "NextPageToken", default_limit=12)
+
+    # --- CloudFormation ---
+
+    def cloudformation_DescribeStacks(self, _, params: dict) -> dict:
+        if stack_name := params.get("StackName"):
+            if not (stacks := [i for i in self.stacks if stack_name in (i["StackName"], i["StackId"])]):
+                raise FakeAwsError("ValidationError")
+            return {"Stacks": stacks}
+        return paginate(self.stacks, params, "Stacks")
+
+    def cloudformation_ListStackResources(self, _, params: dict) -> dict:
+        return paginate(self.stack_resources[params["StackName"]], params, "StackResourceSummaries")
+
+    # --- CloudWatch ---
+
+    def cloudwatch_DescribeAlarms(self, _, params: dict) -> dict:
+        res: dict = paginate(self.metric_alarms, params, "MetricAlarms", limit_key="MaxRecords", default_limit=50)
+        res["CompositeAlarms"] = []
+        return res
+
+    # --- CloudWatch Logs ---
+
+    def logs_DescribeLogGroups(self, _, params: dict) -> dict:
+        log_groups: list[dict] = self.log_groups
+        if prefix := params.get("logGroupNamePrefix"):
+            log_groups = [i for i in log_groups if i["logGroupName"].startswith(prefix)]
+        if pattern := params.get("logGroupNamePattern"):
+            log_groups = [i for i in log_groups if pattern.lower() in i["logGroupName"].lower()]
+        return paginate(log_groups, params, "logGroups", "nextToken", limit_key="limit", default_limit=50)
+
+    def logs_DeleteLogGroup(self, _, params: dict) -> dict:
+        self.log_groups = [i for i in self.log_groups if i["logGroupName"] != params["logGroupName"]]
+        return {}
+
+    # --- ECS ---
+
+    def ecs_ListClusters(self, region: str, params: dict) -> dict:
+        return paginate(
+            [f"arn:aws:ecs:{region}:{account_id}:cluster/{i}" for i in sorted(self.ecs_clusters)],
+            params,
+            "clusterArns",
+            "nextToken",
+            limit_key="maxResults",
+        )
+
+    def ecs_DescribeClusters(self, region: str, params: dict) -> dict:
+        names: list[str] = [i.rsplit(sep="/", maxsplit=1)[-1] for i in params["clusters"]]
+        return {
+            "clusters": [
+                {"clusterArn": f"arn:aws:ecs:{region}:{account_id}:cluster/{i}", "clusterName": i, "status": "ACTIVE"}
+                for i in names
+                if i in self.ecs_clusters
+            ],
+            "failures": [{"arn": i, "reason": "MISSING"} for i in names if i not in self.ecs_clusters],
+        }
+
+    # --- EventBridge ---
+
+    def events_ListRules(self, _, params: dict) -> dict:
+        rules: list[dict] = [i for i in self.events_rules if i["Name"].startswith(params.get("NamePrefix", ""))]
+        return paginate(rules, params, "Rules", limit_key="Limit")
+
+    # --- Lambda ---
+
+    def lambda_GetFunction(self, _, params: dict) -> dict:
+        if params["FunctionName"] not in self.lambda_functions:
+            raise FakeAwsError("ResourceNotFoundException", 404)
+        return {"Configuration": {"FunctionName": params["FunctionName"]}}
+
+    def lambda_ListFunctions(self, _, params: dict) -> dict:
+        return paginate(
+            [{"FunctionName": i} for i in sorted(self.lambda_functions)],
+            params,
+            "Functions",
+            "Marker",
+            "NextMarker",
+            limit_key="MaxItems",
+            default_limit=50,
+        )
+
+    # --- Organizations ---
+
+    def organizations_ListAccounts(self, _, params: dict) -> dict:
+        return paginate(self.accounts, params, "Accounts", limit_key="MaxResults", default_limit=20)
+
+    # --- RDS ---
+
+    def rds_DescribeDBInstances(self, _, params: dict) -> dict:
+        if db_instance_id := params.get("DBInstanceIdentifier"):
+            if db_instance_id not in self.rds_instances:
+                raise FakeAwsError("DBInstanceNotFound", 404)
+            return {"DBInstances": [{"DBInstanceIdentifier": db_instance_id}]}
+        return paginate(
+            [{"DBInstanceIdentifier": i} for i in sorted(self.rds_instances)],
+            params,
+            "DBInstances",
+            "Marker",
+            limit_key="MaxRecords",
+        )
+
+    # --- Route53 ---
+
+    def route53_ListHostedZones(self, _, params: dict) -> dict:
+        return paginate(
+            self.hosted_zones,
+            params,
+            "HostedZones",
+            "Marker",
+            "NextMarker",
+            limit_key="MaxItems",
+            is_truncated_key="IsTruncated",
+        )
+
+    def route53_ListResourceRecordSets(self, _, params: dict) -> dict:
+        records: list[dict] = self.record_sets[params["HostedZoneId"]]
+        start: int = (
+            next(n for n, i in enumerate(records) if i["Name"] == params["StartRecordName"])
+            if "StartRecordName" in params
+            else 0
+        )
+        end: int = start + int(params.get("MaxItems", 300))
+        res: dict = {"ResourceRecordSets": records[start:end], "IsTruncated": end < len(records), "MaxItems": "300"}
+        if end < len(records):
+            res["NextRecordName"] = records[end]["Name"]
+            res["NextRecordType"] = records[end]["Type"]
+        return res
+
+    def route53_ChangeResourceRecordSets(self, _, params: dict) -> dict:
+        names: set[str] = {i["ResourceRecordSet"]["Name"] for i in params["ChangeBatch"]["Changes"]}
+        self.record_sets[params["HostedZoneId"]][:] = [
+            i for i in self.record_sets[params["HostedZoneId"]] if i["Name"] not in names
+        ]
+        return {"ChangeInfo": {"Id": f"/change/C{self.calls:08d}", "Status": "PENDING", "SubmittedAt": datetime.now()}}
+
+    def route53_GetChange(self, _, params: dict) -> dict:
+        return {"ChangeInfo": {"Id": params["Id"], "Status": "INSYNC", "SubmittedAt": datetime.now()}}
+
+    # --- SNS ---
+
+    def sns_ListTopics(self, _, params: dict) -> dict:
+        return paginate(self.sns_topics, params, "Topics")
+
+    def sns_ListSubscriptionsByTopic(self, _, params: dict) -> dict:
+        subscribed: bool = int(hashlib.md5(params["TopicArn"].encode()).hexdigest()[:2], 16) % 2 == 0
+        return {"Subscriptions": [{"TopicArn": params["TopicArn"], "Protocol": "email"}] if subscribed else []}
+
+    # --- SSM ---
+
+    def ssm_DescribeParameters(self, _, params: dict) -> dict:
+        parameters: list[dict] = self.ssm_parameters
+        for parameter_filter in params.get("ParameterFilters", []):
+            parameters = [i for i in parameters if any(v in i["Name"] for v in parameter_filter["Values"])]
+        return paginate(parameters, params, "Parameters", limit_key="MaxResults", default_limit=50)
+
+    def ssm_GetParameter(self, _, params: dict) -> dict:
+        name: str = params["Name"]
+        value: str = (
+            f"i-{hashlib.md5(name.encode()).hexdigest()[:17]}"
+            if "BastionHostLinux" in name
+            else json.dumps({"targethost": f"{name.rsplit(sep='/', maxsplit=1)[-1]}.internal", "destport": "3306"})
+        )
+        return {"Parameter": {"Name": name, "Value": value, "Type": "SecureString"}}
+
+    # --- STS ---
+
+    def sts_GetCallerIdentity(self, *_) -> dict:
+        return {"Account": account_id, "Arn": f"arn:aws:iam::{account_id}:user/benchmark", "UserId": "benchmark"}
+
+
+def run_script(name: str, sizes: dict[str, int], seed: int) -> dict:
+    path, func_name, kwargs = scripts_meta[name]
+    CommonFuncs.reset_run_state(cold=True)
+    fake_aws = FakeAws(sizes, seed=seed)
+    session = boto3.session.Session(region_name="us-east-1")
+    session.events.register("before-parameter-build", FakeAws.stash_params)
+    session.events.register("before-call", fake_aws)
+    CommonFuncs._sessions[None] = session  # pylint: disable=protected-access
+
+    spec = importlib.util.spec_from_file_location(name.replace("-", "_"), os.path.join(repo_path, path))
+    module = importlib.util.module_from_spec(spec)
+    cwd: str = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.chdir(tmp_dir)
+        try:
+            spec.loader.exec_module(module)
+            tracemalloc.start()
+            start: float = time.perf_counter()
+            error: str = None
+            try:
+                getattr(module, func_name)(**kwargs)
+            except SystemExit as ex:
+                error = f"sys.exit({ex.code})"
+            wall_time: float = time.perf_counter() - start
+            peak_memory: int = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            os.chdir(cwd)
+    return {
+        "script": name,
+        "wall_time_s": round(wall_time, 3),
+        "api_calls": fake_aws.calls,
+        "peak_memory_mb": round(peak_memory / 1024 / 1024, 2),
+        "error": error,
+    }
+
+
+def main(scripts: list[str], sizes: dict[str, int], seed: int, json_path: str = None):
+    os.environ.setdefault("AWS_ACCESS_KEY_ID", "benchmark")
+    os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "benchmark")
+    os.environ.pop("AWS_PROFILE", None)
+
+    print(f"## Benchmark inventory sizes: {sizes}")
+    results: list[dict] = []
+    for name in scripts:
+        results.append(result := run_script(name, sizes, seed))
+        print(
+            f"## {result['script']:<36} wall time: {result['wall_time_s']:>8.3f}s, "
+            f"API calls: {result['api_calls']:>6}, peak memory: {result['peak_memory_mb']:>8.2f}MB"
+            f"{f', ERROR: {error}' if (error := result['error']) else ''}"
+        )
+    if json_path:
+        with open(json_path, "w+", encoding="utf-8") as f:
+            json.dump({"sizes": sizes, "seed": seed, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Benchmark scripts offline, against an in-process fake AWS backend serving synthetic inventories, "
+        "reporting wall time, AWS API call count and peak memory per script."
+    )
+    parser.add_argument(
+        "--scripts",
+        nargs="+",
+        choices=list(scripts_meta),
+        default=list(scripts_meta),
+        help="Optionally, specify the scripts to benchmark (default: all).",
+    )
+    for size_name, size in default_sizes.items():
+        parser.add_argument(
+            f"--{size_name.replace('_', '-')}",
+            default=size,
+            help=f"Optionally, specify the number of synthetic {size_name.replace('_', ' ')} (default: {size}).",
+            type=int,
+        )
+    parser.add_argument("--seed", default=0, help="Optionally, specify the random seed (default: 0).", type=int)
+    parser.add_argument("--json", help="Optionally, write the benchmark results to a JSON file.", type=str)
+    parser.add_argument("--verbose", action="store_true", help="Optionally, show the scripts' logs.")
+    args = parser.parse_args()
+    if args.verbose:
+        logger.setLevel(logging.INFO)
+    main(
+        scripts=args.scripts,
+        sizes={i: getattr(args, i) for i in default_sizes},
+        seed=args.seed,
+        json_path=args.json,
+    )
@@ -1,10 +1,142 @@
+import atexit
+import gzip
+import hashlib
+import heapq
 import json
+import os
+import pickle
+import sqlite3
 import sys
-from typing import Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterator, Union
 
 import boto3
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
 from botocore.exceptions import ClientError, EndpointConnectionError
 
+from aws_service_name import AwsServiceName as aws
+
+
+class RateLimiter:
+    # Token bucket rate limiter, with adaptive (AIMD) back-off: the rate is halved on each throttling error, and
+    # recovers gradually (back up to the max rate) on each successful response
+    def __init__(self, rate: float, min_rate: float = 0.5):
+        self.max_rate: float = rate
+        self.min_rate: float = min(min_rate, rate)
+        self.rate: float = rate
+        self.capacity: float = max(1.0, rate)
+        self.tokens: float = self.capacity
+        self.updated: float = time.monotonic()
+        self.lock: threading.Lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now: float = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            wait: float = (1 - self.tokens) / self.rate if self.tokens < 1 else 0
+            self.tokens -= 1  # Reserve a token, even if the bucket is in debt, so waiting callers queue up in order
+        if wait:
+            time.sleep(wait)
+
+    def throttled(self):
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+
+    def succeeded(self):
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate + (self.max_rate / 20))
+
+
+class ResultRecorder(dict):
+    # A dict of AWS API responses (for an AWS client), which appends each response to an NDJSON file as it is recorded
+    # (buffering at most 'buffer_size' lines in memory), and only holds the latest 'max_items' responses in memory for
+    # read-back (older ones having been written). Assigning an empty dict to a section key (i.e. an AWS API operation,
+    # directly under the AWS client's recorder) also creates a nested recorder (sharing the file), so nested responses
+    # (e.g. 'res[aws.logs_str]["delete_log_group"][name]') are recorded as they arrive too. All other values (incl. any
+    # deeper empty dicts) are recorded as-is.
+    _roots: list["ResultRecorder"] = []  # Flushed (and forgotten) by 'close_all', e.g. at exit
+
+    def __init__(
+        self,
+        path: str,
+        strip_metadata: bool = False,
+        compress: bool = False,
+        buffer_size: int = 100,
+        max_items: int = 1000,
+        parent: "ResultRecorder" = None,
+        key: list[str] = None,
+    ):
+        super().__init__()
+        self.root: ResultRecorder = parent.root if parent is not None else self
+        self.key: list[str] = key if key else []
+        self.max_items: int = max_items
+        self._leaves: dict[Hashable, None] = {}  # Insertion-ordered keys of (non-nested) responses held in memory
+        if parent is None:
+            self.path: str = f"{path}.gz" if compress else path
+            self.strip_metadata: bool = strip_metadata
+            self.compress: bool = compress
+            self.buffer_size: int = buffer_size
+            self.buffer: list[str] = []
+            self.lock: threading.Lock = threading.Lock()
+            self.opened: bool = False
+            ResultRecorder._roots.append(self)
+
+    def __setitem__(self, key: Hashable, value: Any):
+        if not self.key and isinstance(value, dict) and not value and not isinstance(value, ResultRecorder):
+            # The (empty) section is recorded too, so an empty response (rather than a section) is not dropped
+            super().__setitem__(key, ResultRecorder(None, max_items=self.max_items, parent=self, key=[key]))
+            self.root.record([key], value)
+            return
+        super().__setitem__(key, value)
+        self._leaves.pop(key, None)
+        self._leaves[key] = None
+        if len(self._leaves) > self.max_items:
+            evicted_key: Hashable = next(iter(self._leaves))
+            del self._leaves[evicted_key]
+            super().pop(evicted_key, None)
+        self.root.record(self.key + [key], value)
+
+    def record(self, key: list[str], value: Any):
+        if self.strip_metadata and isinstance(value, dict):
+            value = {k: v for k, v in value.items() if k != "ResponseMetadata"}
+        line: str = json.dumps({"key": key, "value": value}, default=str, separators=(",", ":"))
+        with self.lock:
+            self.buffer.append(f"{line}\n")
+            if len(self.buffer) >= self.buffer_size:
+                self._flush()
+
+    @classmethod
+    def close_all(cls):
+        while cls._roots:
+            cls._roots.pop().flush()
+
+    def flush(self):
+        with self.root.lock:
+            self.root._flush()  # pylint: disable=protected-access
+
+    def _flush(self):
+        # Must be called holding 'lock'. The file is truncated on the first flush, and appended to thereafter (for
+        # gzip, each flush appends a complete gzip member, so a crash still leaves a readable partial record).
+        if self.opened and not self.buffer:
+            return
+        mode: str = "at" if self.opened else "wt"
+        with (
+            gzip.open(self.path, mode, encoding="utf-8") if self.compress else open(self.path, mode, encoding="utf-8")
+        ) as f:
+            f.writelines(self.buffer)
+        self.buffer.clear()
+        self.opened = True
+
+
+atexit.register(ResultRecorder.close_all)
+
 
 class CommonFuncs:
     starting_str: str = "Starting"
@@ -34,6 +166,133 @@ class CommonFuncs:
         "sa-east-1": "America/Sao_Paulo",  # São Paulo
     }
 
+    # Max number of concurrent workers (threads), when fanning out work (e.g. across AWS regions)
+    max_workers: int = 8
+
+    # Client config policy, shared by all cached AWS clients (can be overridden per script via kwargs)
+    max_pool_connections: int = 32  # Default: 10
+    connect_timeout: int = 10  # Default: 60
+    read_timeout: int = 60  # Default: 60
+    tcp_keepalive: bool = True  # Default: False
+
+    # Retry policy for throttled (and transient) errors, with exponential back-off, before raising a 'ClientError'
+    max_attempts: int = 10  # Default: 3
+
+    # Max sustainable AWS API call rate (requests per second) per AWS service and AWS region, shared by all clients
+    rate_limit_default: float = 20
+    rate_limits: dict[str, float] = {
+        "ce": 5,
+        "cloudformation": 10,
+        "logs": 10,
+        "organizations": 2,
+        "route53": 5,
+    }
+    # AWS services whose AWS API call rate limits are account-wide, rather than per AWS region
+    rate_limits_global: list[str] = ["ce", "organizations", "route53"]
+    throttling_error_codes: list[str] = [
+        "EC2ThrottledException",
+        "PriorRequestNotComplete",
+        "RequestLimitExceeded",
+        "RequestThrottled",
+        "RequestThrottledException",
+        "SlowDown",
+        "Throttled",
+        "ThrottledException",
+        "Throttling",
+        "ThrottlingException",
+        "TooManyRequestsException",
+    ]
+
+    _rate_limiters: dict[tuple[str, str, str], RateLimiter] = {}
+
+    # IAM role session name, used when assuming an IAM role (e.g. in another AWS account), see 'get_role_session'
+    role_session_name: str = "aws-scripts-examples"
+
+    # Process-wide cache of AWS sessions (keyed by profile, and any IAM role assumed) and clients (keyed by profile, any
+    # IAM role assumed, region and service)
+    _sessions: dict[str, boto3.session.Session] = {}
+    _role_sessions: dict[tuple[str, str], boto3.session.Session] = {}
+    _clients: dict[tuple[str, str, str, str], object] = {}
+    _client_role_arns: dict[object, str] = {}
+    _clients_lock: threading.Lock = threading.Lock()
+    # Env vars which select the AWS credentials (of sessions, clients and account IDs), see 'reset_run_state'
+    credentials_env_vars: tuple[str, ...] = (
+        "AWS_ACCESS_KEY_ID",
+        "AWS_SECRET_ACCESS_KEY",
+        "AWS_SESSION_TOKEN",
+        "AWS_PROFILE",
+        "AWS_CONFIG_FILE",
+        "AWS_SHARED_CREDENTIALS_FILE",
+        "AWS_ROLE_ARN",
+        "AWS_WEB_IDENTITY_TOKEN_FILE",
+    )
+    _credentials_env_hash: str = None
+
+    # AWS Amplify app index (app name -> app ID, tags and env vars), per AWS account and AWS region, to save re-listing
+    # all AWS Amplify apps for each lookup (optionally persisted on-disk, by setting 'amplify_app_index_path' via
+    # kwargs)
+    amplify_app_index_ttl: int = 300  # Seconds
+    amplify_app_index_path: str = None
+    # AWS Amplify API operations which invalidate the AWS Amplify app index, when called
+    amplify_app_index_invalidating_ops: list[str] = [
+        "CreateApp",
+        "DeleteApp",
+        "UpdateApp",
+        "TagResource",
+        "UntagResource",
+    ]
+
+    _amplify_app_indexes: dict[str, tuple[float, dict[str, dict]]] = {}
+
+    # Opt-in on-disk cache of read-only AWS API call response pages (see 'use_response_cache'), keyed by AWS account,
+    # AWS region, AWS API operation and params. Only AWS API operations with a TTL (in seconds) are cached.
+    response_cache_dir: str = os.path.join(os.path.expanduser("~"), ".cache", "aws-scripts-examples")
+    response_cache_max_bytes: int = 256 * 1024 * 1024
+    response_cache_ttls: dict[str, int] = {
+        "DescribeLogGroups": 600,
+        "DescribeStacks": 600,
+        "ListApps": 300,
+        "ListCertificates": 3600,
+        "ListHostedZones": 3600,
+        "ListResourceRecordSets": 600,
+        "ListStackResources": 600,
+    }
+    # AWS API operations which invalidate cached AWS API operations (of the same AWS service and AWS region) when
+    # called, so a re-run (within the TTL) does not act on responses listing already deleted (or changed) resources
+    response_cache_invalidating_ops: dict[str, list[str]] = {
+        "ChangeResourceRecordSets": ["ListResourceRecordSets"],
+        "CreateHostedZone": ["ListHostedZones"],
+        "DeleteHostedZone": ["ListHostedZones"],
+        "CreateLogGroup": ["DescribeLogGroups"],
+        "DeleteLogGroup": ["DescribeLogGroups"],
+        "DeleteRetentionPolicy": ["DescribeLogGroups"],
+        "PutRetentionPolicy": ["DescribeLogGroups"],
+        "DeleteCertificate": ["ListCertificates"],
+        "ImportCertificate": ["ListCertificates"],
+        "RequestCertificate": ["ListCertificates"],
+        "CreateStack": ["DescribeStacks", "ListStackResources"],
+        "DeleteStack": ["DescribeStacks", "ListStackResources"],
+        "UpdateStack": ["DescribeStacks", "ListStackResources"],
+    }
+
+    _response_cache: sqlite3.Connection = None
+    _response_cache_refresh: bool = False
+    _response_cache_lock: threading.Lock = threading.Lock()
+    _account_ids: dict[str, str] = {}
+
+    # AWS API call stats (per AWS service, AWS API operation and AWS region), summarised by 'info_log_finished'
+    api_call_stats_slowest: int = 10
+
+    _api_call_stats: dict[tuple[str, str, str], dict] = {}
+    _api_calls_slowest: list[tuple[float, str, str, str]] = []
+    _api_call_stats_lock: threading.Lock = threading.Lock()
+
+    # Result recorder policy, for the AWS API responses recorded by each script (see 'ResultRecorder')
+    result_recorder_strip_metadata: bool = False  # Omit each response's 'ResponseMetadata' (incl. HTTP headers)
+    result_recorder_compress: bool = False  # Gzip the NDJSON files
+    result_recorder_buffer_size: int = 100  # Max lines buffered in memory, before appending to the NDJSON file
+    result_recorder_max_items: int = 1000  # Max responses held in memory (per nested dict), for read-back
+
     def __init__(self, logger, filename, json_paths=None, **kwargs):
         self.logger = logger
         self.filename = filename
@@ -41,6 +300,31 @@ class CommonFuncs:
             self.json_paths = self.gen_json_paths(json_paths)
         self.__dict__.update(kwargs)
 
+    def fan_out(
+        self, func: Callable, items: list[Hashable], max_workers: int = None, desc: str = None
+    ) -> tuple[dict[Hashable, Any], dict[Hashable, BaseException]]:
+        # Run 'func(item)' for each item on a bounded thread pool, collecting the results and errors per item (an error
+        # for one item does not abort the others), both in the same (deterministic) order as 'items'
+        desc = desc if desc else func.__name__
+        results: dict[Hashable, Any] = {}
+        errors: dict[Hashable, BaseException] = {}
+        with ThreadPoolExecutor(max_workers=max_workers if max_workers else self.max_workers) as executor:
+            futures: dict = {item: executor.submit(func, item) for item in items}
+            for item, future in futures.items():
+                try:
+                    results[item] = future.result()
+                except (Exception, SystemExit) as ex:  # pylint: disable=broad-except
+                    self.logger.error(f"## {desc} ERROR ('{item}'): '{ex}'")
+                    errors[item] = ex
+        return results, errors
+
+    def fan_out_regions(
+        self, func: Callable, regions: list[str] = None, max_workers: int = None, desc: str = None
+    ) -> tuple[dict[str, Any], dict[str, BaseException]]:
+        # Run 'func(region)' for each AWS region (default: all AWS regions in 'region_timezones_meta') concurrently
+        regions = regions if regions else list(self.region_timezones_meta)
+        return self.fan_out(func, regions, max_workers=max_workers if max_workers else len(regions), desc=desc)
+
     def gen_json_paths(self, json_paths: list[Union[str, tuple[str, list[str]]]], f: str = None) -> dict:
         filename_no_ext: str = f if f else self.filename.rsplit(sep=".", maxsplit=1)[0]
         paths: dict = {}
@@ -48,7 +332,7 @@ class CommonFuncs:
             if isinstance(i, tuple):
                 paths[i[0]] = self.gen_json_paths(i[1], f=f"{filename_no_ext}-{i[0]}")
             else:
-                paths[i] = f"{filename_no_ext}-{i}-res.json"
+                paths[i] = f"{filename_no_ext}-{i}-res.ndjson"
         return paths
 
     def info_log(self, action: str, opt: str = None):
@@ -60,45 +344,348 @@ class CommonFuncs:
         self.info_log(self.starting_str, opt=opt)
 
     def info_log_finished(self, opt: str = None):
+        self.log_api_call_stats()
         self.info_log(self.finished_str, opt=opt)
 
-    def amplify_list_apps(self, amplify) -> list[dict]:
-        self.logger.info("## List all AWS Amplify apps")
-        is_next_token: bool = True
-        next_token: str = None
-        amplify_list_apps_res_apps: list = []
-        while is_next_token:
-            try:
-                amplify_list_apps_res = amplify.list_apps(
-                    **{
-                        k: v
-                        for k, v in {
-                            "nextToken": next_token if next_token else None,
-                            "maxResults": 100,  # Max 100. Default: 10
-                        }.items()
-                        if v
+    def record_api_call(self, key: tuple[str, str, str], **kwargs):
+        with self._api_call_stats_lock:
+            stats: dict = self._api_call_stats.setdefault(
+                key, {"count": 0, "errors": 0, "retries": 0, "throttles": 0, "latencies": []}
+            )
+            for k, v in kwargs.items():
+                if k == "latency":
+                    stats["latencies"].append(v)
+                    heapq.heappush(self._api_calls_slowest, (v, *key))
+                    if len(self._api_calls_slowest) > self.api_call_stats_slowest:
+                        heapq.heappop(self._api_calls_slowest)
+                else:
+                    stats[k] += v
+
+    @classmethod
+    def reset_run_state(cls, cold: bool = False):
+        # Reset the process-wide state of a single script run (AWS API call stats, and any opt-in response cache), for
+        # a long-lived process running many scripts (e.g. 'aws-scripts.py serve'). Sessions, clients, account IDs and
+        # rate limiters are kept warm, unless the (per run) AWS credentials env vars have changed since the last run,
+        # or 'cold' is set (which also clears the AWS Amplify app indexes, e.g. for benchmarking each run from cold).
+        credentials_env_hash: str = hashlib.sha256(
+            json.dumps([os.getenv(i) for i in cls.credentials_env_vars]).encode()
+        ).hexdigest()
+        with cls._clients_lock:
+            if cold or credentials_env_hash != cls._credentials_env_hash:
+                for i in [cls._sessions, cls._role_sessions, cls._clients, cls._client_role_arns, cls._account_ids]:
+                    i.clear()
+                cls._rate_limiters.clear()  # Rate limits are per AWS account
+                cls._credentials_env_hash = credentials_env_hash
+            if cold:
+                cls._amplify_app_indexes.clear()
+        with cls._api_call_stats_lock:
+            cls._api_call_stats.clear()
+            cls._api_calls_slowest.clear()
+        with cls._response_cache_lock:
+            if cls._response_cache is not None:
+                cls._response_cache.close()
+            cls._response_cache = None
+            cls._response_cache_refresh = False
+
+    @staticmethod
+    def percentile(values: list[float], p: float) -> float:
+        # Nearest-rank percentile, of an already sorted list of values
+        return values[max(0, min(len(values) - 1, int(round(p / 100 * len(values))) - 1))] if values else 0
+
+    def get_api_call_stats(self) -> dict:
+        with self._api_call_stats_lock:
+            operations: list[dict] = []
+            for (service, operation, region), stats in sorted(self._api_call_stats.items()):
+                latencies: list[float] = sorted(stats["latencies"])
+                operations.append(
+                    {
+                        "service": service,
+                        "operation": operation,
+                        "region": region,
+                        **{k: v for k, v in stats.items() if k != "latencies"},
+                        "total_ms": round(sum(latencies) * 1000, 1),
+                        **{f"p{p}_ms": round(self.percentile(latencies, p) * 1000, 1) for p in [50, 90, 99]},
+                        "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0,
                     }
                 )
-                self.logger.info("## Amplify List Apps successful response")
+            return {
+                **{k: sum(i[k] for i in operations) for k in ["count", "errors", "retries", "throttles"]},
+                "operations": operations,
+                "slowest": [
+                    {"service": service, "operation": operation, "region": region, "ms": round(latency * 1000, 1)}
+                    for latency, service, operation, region in sorted(self._api_calls_slowest, reverse=True)
+                ],
+            }
+
+    def log_api_call_stats(self):
+        if not self._api_call_stats:
+            return
+        stats: dict = self.get_api_call_stats()
+        self.logger.info(
+            f"## AWS API calls: {stats['count']} (errors: {stats['errors']}, retries: {stats['retries']}, "
+            f"throttles: {stats['throttles']})"
+        )
+        for i in sorted(stats["operations"], key=lambda i: i["total_ms"], reverse=True):
+            self.logger.info(
+                f"##   {i['service']}:{i['operation']} ({i['region']}) x{i['count']} - total: {i['total_ms']}ms, "
+                f"p50: {i['p50_ms']}ms, p90: {i['p90_ms']}ms, p99: {i['p99_ms']}ms, max: {i['max_ms']}ms"
+            )
+        api_call_stats_path: str = f"{self.filename.rsplit(sep='.', maxsplit=1)[0]}-api-calls.json"
+        self.logger.info(f"## Writing AWS API call stats to: '{api_call_stats_path}'")
+        with open(api_call_stats_path, "w+", encoding="utf-8") as f:
+            json.dump(stats, f, indent=2, default=str)
+
+    def make_response_cache_dir(self):
+        # Only the current user can read (or write) the cache dir, as cached responses are unpickled when read
+        Path(self.response_cache_dir).mkdir(mode=0o700, parents=True, exist_ok=True)
+        os.chmod(self.response_cache_dir, 0o700)
+
+    def use_response_cache(self, refresh: bool = False):
+        # When 'refresh' is set, cached responses are ignored (and overwritten with fresh responses)
+        self.make_response_cache_dir()
+        response_cache_path: str = os.path.join(self.response_cache_dir, "responses.sqlite3")
+        os.close(os.open(response_cache_path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(response_cache_path, 0o600)
+        self.logger.info(f"## Using response cache: '{response_cache_path}'{' (refresh)' if refresh else ''}")
+        with self._response_cache_lock:
+            CommonFuncs._response_cache = sqlite3.connect(response_cache_path, check_same_thread=False)
+            CommonFuncs._response_cache_refresh = refresh
+            self._response_cache.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, account TEXT, region TEXT, service TEXT, "
+                "operation TEXT, created REAL, accessed REAL, size INTEGER, value BLOB)"
+            )
+            self._response_cache.commit()
+
+    def get_account_id(self, region: str, role_arn: str = None) -> str:
+        if role_arn:
+            # E.g. 'arn:aws:iam::123456789012:role/role-name'
+            return role_arn.split(sep=":")[4]
+        profile: str = os.getenv("AWS_PROFILE")
+        if profile not in self._account_ids:
+            try:
+                self._account_ids[profile] = self.get_client(region, aws.sts_str).get_caller_identity()["Account"]
+                self.logger.info("## STS Get Caller Identity successful response")
+            except ClientError as ex:
+                self.logger.error(f"## STS Get Caller Identity ERROR: '{ex}'")
+                sys.exit(1)
+        return self._account_ids[profile]
+
+    def get_response_cache_key(self, method: Callable, params: dict) -> tuple[str, tuple[str, str, str, str]]:
+        client = method.__self__
+        meta: tuple[str, str, str, str] = (
+            self.get_account_id(client.meta.region_name, role_arn=self._client_role_arns.get(client)),
+            client.meta.region_name,
+            client.meta.service_model.service_name,
+            client.meta.method_to_api_mapping[method.__name__],
+        )
+        key: str = hashlib.sha256(json.dumps([meta, params], sort_keys=True, default=str).encode()).hexdigest()
+        return key, meta
+
+    def is_response_cacheable(self, method: Callable) -> bool:
+        return (
+            self._response_cache is not None
+            and hasattr(method, "__self__")
+            and method.__self__.meta.method_to_api_mapping.get(method.__name__) in self.response_cache_ttls
+        )
+
+    def response_cache_get(self, method: Callable, params: dict) -> dict:
+        if self._response_cache_refresh:
+            return None
+        key, meta = self.get_response_cache_key(method, params)
+        with self._response_cache_lock:
+            row = self._response_cache.execute("SELECT created, value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or time.time() - row[0] >= self.response_cache_ttls[meta[3]]:
+                return None
+            self._response_cache.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+            self._response_cache.commit()
+        return pickle.loads(row[1])
+
+    def response_cache_put(self, method: Callable, params: dict, page: dict):
+        key, meta = self.get_response_cache_key(method, params)
+        value: bytes = pickle.dumps(page)
+        now: float = time.time()
+        with self._response_cache_lock:
+            self._response_cache.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, *meta, now, now, len(value), value),
+            )
+            # Evict the least recently used responses, until the cache is back within its size limit
+            total: int = self._response_cache.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.response_cache_max_bytes:
+                for k, size in self._response_cache.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed ASC"
+                ).fetchall():
+                    self._response_cache.execute("DELETE FROM responses WHERE key = ?", (k,))
+                    total -= size
+                    if total <= self.response_cache_max_bytes:
+                        break
+            self._response_cache.commit()
+
+    def response_cache_invalidate(self, region: str, service: str, operation: str = None):
+        if self._response_cache is None:
+            return
+        with self._response_cache_lock:
+            self._response_cache.execute(
+                "DELETE FROM responses WHERE region = ? AND service = ?" + (" AND operation = ?" if operation else ""),
+                (region, service, operation) if operation else (region, service),
+            )
+            self._response_cache.commit()
+
+    def invalidate_response_cache(self, c, model=None, **_):
+        # Used as a botocore 'after-call' event handler, on all clients
+        if model and (operations := self.response_cache_invalidating_ops.get(model.name)):
+            for operation in operations:
+                self.response_cache_invalidate(c.meta.region_name, c.meta.service_model.service_name, operation)
+
+    def paginate_pages(
+        self,
+        method: Callable,
+        desc: str,
+        token_key: str = "NextToken",
+        res_token_key: str = None,
+        is_truncated_key: str = None,
+        on_error: Callable[[], None] = None,
+        break_on_endpoint_error: bool = False,
+        **kwargs,
+    ) -> Iterator[dict]:
+        # Lazily yield each response page of a paginated AWS API call, following the next token (request arg:
+        # 'token_key', response key: 'res_token_key' (defaults to 'token_key')) until there are no more pages.
+        # Any remaining kwargs are passed as-is to the AWS API call, for every page.
+        res_token_key = res_token_key if res_token_key else token_key
+        is_cacheable: bool = self.is_response_cacheable(method)
+        next_token: str = None
+        while True:
+            params: dict = {
+                **kwargs,
+                **{
+                    k: v
+                    for k, v in {
+                        token_key: next_token if next_token else None,
+                    }.items()
+                    if v
+                },
+            }
+            try:
+                if is_cacheable and (page := self.response_cache_get(method, params)) is not None:
+                    self.logger.info(f"## {desc} cached response")
+                else:
+                    page = method(**params)
+                    self.logger.info(f"## {desc} successful response")
+                    if is_cacheable:
+                        self.response_cache_put(method, params, page)
             except EndpointConnectionError as ex:
-                self.logger.error(f"## Amplify List Apps ERROR: '{ex}'")
-                break
+                self.logger.error(f"## {desc} ERROR: '{ex}'")
+                if break_on_endpoint_error:
+                    return
+                if on_error:
+                    on_error()
+                sys.exit(1)
             except ClientError as ex:
-                self.logger.error(f"## Amplify List Apps ERROR: '{ex}'")
+                self.logger.error(f"## {desc} ERROR: '{ex}'")
+                if on_error:
+                    on_error()
                 sys.exit(1)
-            if "nextToken" in amplify_list_apps_res:
-                next_token = amplify_list_apps_res["nextToken"]
-            else:
-                is_next_token = False
-            amplify_list_apps_res_apps += amplify_list_apps_res["apps"]
-        return amplify_list_apps_res_apps
+            yield page
+            if is_truncated_key and not page.get(is_truncated_key):
+                return
+            if not (next_token := page.get(res_token_key)):
+                return
+
+    def paginate(
+        self,
+        method: Callable,
+        result_key: str,
+        desc: str,
+        max_items: int = None,
+        **kwargs,
+    ) -> Iterator[dict]:
+        # Lazily yield each item (under 'result_key') across all response pages, a page is only requested once all
+        # items of the previous page have been consumed (stop early by breaking, or by specifying 'max_items')
+        items: Iterator[dict] = chain.from_iterable(
+            page.get(result_key, []) for page in self.paginate_pages(method, desc, **kwargs)
+        )
+        return islice(items, max_items) if max_items else items
+
+    def amplify_list_apps(self, amplify, max_items: int = None) -> Iterator[dict]:
+        self.logger.info("## List all AWS Amplify apps")
+        return self.paginate(
+            amplify.list_apps,
+            "apps",
+            "Amplify List Apps",
+            max_items=max_items,
+            token_key="nextToken",
+            break_on_endpoint_error=True,
+            maxResults=100,  # Max 100. Default: 10
+        )
+
+    def read_amplify_app_index_file(self) -> dict[str, dict]:
+        if self.amplify_app_index_path and os.path.exists(self.amplify_app_index_path):
+            with open(self.amplify_app_index_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        return {}
+
+    def write_amplify_app_index_file(self, indexes: dict[str, dict]):
+        with open(self.amplify_app_index_path, "w+", encoding="utf-8") as f:
+            json.dump(indexes, f, indent=2, default=str)
+
+    def get_amplify_app_index_key(self, amplify) -> str:
+        # AWS account ID and AWS region, e.g. '123456789012-eu-west-2'
+        region: str = amplify.meta.region_name
+        return f"{self.get_account_id(region, role_arn=self._client_role_arns.get(amplify))}-{region}"
+
+    def load_amplify_app_index(self, key: str) -> dict[str, dict]:
+        if key in self._amplify_app_indexes:
+            timestamp, index = self._amplify_app_indexes[key]
+            if time.time() - timestamp < self.amplify_app_index_ttl:
+                return index
+        if (meta := self.read_amplify_app_index_file().get(key)) and (
+            time.time() - meta["timestamp"] < self.amplify_app_index_ttl
+        ):
+            self.logger.info(f"## Loaded AWS Amplify app index from: '{self.amplify_app_index_path}'")
+            self._amplify_app_indexes[key] = (meta["timestamp"], meta["apps"])
+            return meta["apps"]
+        return None
+
+    def save_amplify_app_index(self, key: str, index: dict[str, dict]):
+        timestamp: float = time.time()
+        self._amplify_app_indexes[key] = (timestamp, index)
+        if self.amplify_app_index_path:
+            indexes: dict[str, dict] = self.read_amplify_app_index_file()
+            indexes[key] = {"timestamp": timestamp, "apps": index}
+            self.write_amplify_app_index_file(indexes)
+
+    def get_amplify_app_index(self, amplify) -> dict[str, dict]:
+        key: str = self.get_amplify_app_index_key(amplify)
+        if (index := self.load_amplify_app_index(key)) is None:
+            index = {
+                i["name"]: {
+                    "appId": i["appId"],
+                    "appArn": i["appArn"],
+                    "tags": i.get("tags", {}),
+                    "environmentVariables": i.get("environmentVariables", {}),
+                }
+                for i in self.amplify_list_apps(amplify)
+            }
+            self.save_amplify_app_index(key, index)
+        return index
+
+    def invalidate_amplify_app_index(self, amplify, **kwargs):
+        # Also used as a botocore 'after-call' event handler, on AWS Amplify clients
+        if (model := kwargs.get("model")) and model.name not in self.amplify_app_index_invalidating_ops:
+            return
+        key: str = self.get_amplify_app_index_key(amplify)
+        self.logger.info(f"## Invalidating AWS Amplify app index, AWS account and region: {key}")
+        self._amplify_app_indexes.pop(key, None)
+        self.response_cache_invalidate(amplify.meta.region_name, aws.amplify_str)
+        if (indexes := self.read_amplify_app_index_file()) and indexes.pop(key, None):
+            self.write_amplify_app_index_file(indexes)
+
+    def get_amplify_app(self, amplify, amplify_app_name: str) -> dict:
+        return self.get_amplify_app_index(amplify).get(amplify_app_name)
 
     def check_amplify_app_exists(self, amplify, amplify_app_name: str) -> bool:
         self.logger.info(f"## Checking whether there is already an AWS Amplify app of the name: '{amplify_app_name}'")
-        for name in [i["name"] for i in self.amplify_list_apps(amplify)]:
-            if name == amplify_app_name:
-                return True
-        return False
+        return self.get_amplify_app(amplify, amplify_app_name) is not None
 
     @staticmethod
     def get_amplify_app_desc_prefix(amplify_app_name: str) -> str:
@@ -107,11 +694,9 @@ class CommonFuncs:
     def get_amplify_app_id(self, amplify, amplify_app_name: str) -> str:
         prefix: str = self.get_amplify_app_desc_prefix(amplify_app_name)
         self.logger.info(f"## Getting the AWS Amplify app ID {prefix}")
-        amplify_app_id: str = None
-        for name, app_id in {i["name"]: i["appId"] for i in self.amplify_list_apps(amplify)}.items():
-            if name == amplify_app_name:
-                amplify_app_id = app_id
-                break
+        amplify_app_id: str = (
+            amplify_app["appId"] if (amplify_app := self.get_amplify_app(amplify, amplify_app_name)) else None
+        )
         if amplify_app_id is None:
             self.logger.error("## ERROR: Could not find AWS Amplify app ID")
             sys.exit(1)
@@ -121,13 +706,13 @@ class CommonFuncs:
     def get_amplify_app_id_and_tags(self, amplify, amplify_app_name: str) -> tuple[str, dict[str, str]]:
         prefix: str = self.get_amplify_app_desc_prefix(amplify_app_name)
         self.logger.info(f"## Getting the AWS Amplify app ID and tags {prefix}")
-        amplify_app_id: str = None
-        amplify_app_tags: dict[str, str] = None
-        for name, app_id_tags in {i["name"]: (i["appId"], i["tags"]) for i in self.amplify_list_apps(amplify)}.items():
-            if name == amplify_app_name:
-                amplify_app_id = app_id_tags[0]
-                amplify_app_tags = app_id_tags[1]
-                break
+        amplify_app_id: str
+        amplify_app_tags: dict[str, str]
+        amplify_app_id, amplify_app_tags = (
+            (amplify_app["appId"], amplify_app["tags"])
+            if (amplify_app := self.get_amplify_app(amplify, amplify_app_name))
+            else (None, None)
+        )
         if amplify_app_id is None:
             self.logger.error(f"## ERROR: Could not find AWS Amplify app ID {prefix}")
             sys.exit(1)
@@ -138,19 +723,154 @@ class CommonFuncs:
         self.logger.info(f"## AWS Amplify app tags: '{amplify_app_tags}' {prefix}")
         return amplify_app_id, amplify_app_tags
 
-    def get_client(self, region: str, client_name: str):
-        c = boto3.client(client_name, region_name=region)
-        self.logger.info(f"## Connected to {client_name.upper()} via client, AWS region: {region}")
+    def get_client_config(self) -> Config:
+        return Config(
+            max_pool_connections=self.max_pool_connections,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            retries={"max_attempts": self.max_attempts, "mode": "standard"},
+            tcp_keepalive=self.tcp_keepalive,  # Since botocore 1.27.84 (see 'requirements.txt')
+        )
+
+    def get_rate_limiter(self, region: str, client_name: str, role_arn: str = None) -> RateLimiter:
+        # Must be called holding '_clients_lock'. AWS API call rate limits are per AWS account, so clients for an IAM
+        # role assumed (e.g. in another AWS account) have their own rate limiters.
+        key: tuple[str, str, str] = (client_name, role_arn, None if client_name in self.rate_limits_global else region)
+        if key not in self._rate_limiters:
+            self._rate_limiters[key] = RateLimiter(self.rate_limits.get(client_name, self.rate_limit_default))
+        return self._rate_limiters[key]
+
+    def register_api_call_stats(self, c, region: str, client_name: str):
+        # Times each AWS API call (incl. any retries), from 'before-call' to 'after-call' (or 'after-call-error')
+        def before_call(context: dict = None, **_) -> None:
+            context["api_call_start"] = time.perf_counter()
+
+        def after_call(model=None, context: dict = None, parsed: dict = None, **_) -> None:
+            latency: float = time.perf_counter() - context.get("api_call_start", time.perf_counter())
+            self.record_api_call(
+                (client_name, model.name, region),
+                count=1,
+                errors=int("Error" in (parsed if parsed else {})),
+                retries=parsed.get("ResponseMetadata", {}).get("RetryAttempts", 0) if parsed else 0,
+                latency=latency,
+            )
+
+        def after_call_error(event_name: str = None, context: dict = None, **_) -> None:
+            # Emitted with no 'model' (e.g. on connection errors), the operation name is the last part of the event name
+            latency: float = time.perf_counter() - context.get("api_call_start", time.perf_counter())
+            self.record_api_call((client_name, event_name.split(".")[-1], region), count=1, errors=1, latency=latency)
+
+        c.meta.events.register_first("before-call", before_call)
+        c.meta.events.register("after-call", after_call)
+        c.meta.events.register("after-call-error", after_call_error)
+
+    def register_rate_limiter(self, c, region: str, client_name: str, role_arn: str = None):
+        # Each HTTP request (incl. retries) waits for a token, and throttling errors back-off the shared rate
+        rate_limiter: RateLimiter = self.get_rate_limiter(region, client_name, role_arn=role_arn)
+
+        def before_send(**_) -> None:
+            rate_limiter.acquire()
+
+        def needs_retry(response: tuple = None, operation=None, **_) -> None:
+            if response is None:
+                return
+            if (code := response[1].get("Error", {}).get("Code")) in self.throttling_error_codes:
+                rate_limiter.throttled()
+                self.record_api_call((client_name, operation.name, region), throttles=1)
+                self.logger.warning(
+                    f"## {client_name.upper()} throttled ('{code}'), AWS region: {region}, backing off to "
+                    f"{rate_limiter.rate:.2f} requests per second"
+                )
+            elif response[0].status_code < 400:
+                rate_limiter.succeeded()
+
+        c.meta.events.register("before-send", before_send)
+        c.meta.events.register("needs-retry", needs_retry)
+
+    def get_session(self, profile: str = None) -> boto3.session.Session:
+        # Must be called holding '_clients_lock', as creating a session (or a client from it) is not thread-safe
+        if profile not in self._sessions:
+            self._sessions[profile] = boto3.session.Session(profile_name=profile)
+        return self._sessions[profile]
+
+    def get_role_session(self, role_arn: str, profile: str = None) -> boto3.session.Session:
+        # Must be called holding '_clients_lock'. The IAM role is assumed (via STS) with the profile's session, and its
+        # temporary credentials are refreshed (by botocore) before they expire, for long-running scripts.
+        key: tuple[str, str] = (profile, role_arn)
+        if key not in self._role_sessions:
+            sts = self.get_session(profile).client(aws.sts_str, config=self.get_client_config())
+
+            def refresh() -> dict[str, str]:
+                credentials: dict = sts.assume_role(RoleArn=role_arn, RoleSessionName=self.role_session_name)[
+                    "Credentials"
+                ]
+                self.logger.info(f"## STS Assume Role successful response: '{role_arn}'")
+                return {
+                    "access_key": credentials["AccessKeyId"],
+                    "secret_key": credentials["SecretAccessKey"],
+                    "token": credentials["SessionToken"],
+                    "expiry_time": credentials["Expiration"].isoformat(),
+                }
+
+            session = boto3.session.Session(profile_name=profile)
+            # pylint: disable=protected-access
+            session._session._credentials = RefreshableCredentials.create_from_metadata(
+                refresh(), refresh, "assume-role"
+            )
+            self._role_sessions[key] = session
+        return self._role_sessions[key]
+
+    def get_client(self, region: str, client_name: str, profile: str = None, role_arn: str = None):
+        profile = profile if profile else os.getenv("AWS_PROFILE")
+        key: tuple[str, str, str, str] = (profile, role_arn, region, client_name)
+        with self._clients_lock:
+            if key in self._clients:
+                return self._clients[key]
+            session: boto3.session.Session = (
+                self.get_role_session(role_arn, profile=profile) if role_arn else self.get_session(profile)
+            )
+            c = session.client(client_name, region_name=region, config=self.get_client_config())
+            self.register_rate_limiter(c, region, client_name, role_arn=role_arn)
+            self.register_api_call_stats(c, region, client_name)
+            c.meta.events.register("after-call", lambda **kwargs: self.invalidate_response_cache(c, **kwargs))
+            if client_name == aws.amplify_str:
+                c.meta.events.register(
+                    f"after-call.{aws.amplify_str}",
+                    lambda **kwargs: self.invalidate_amplify_app_index(c, **kwargs),
+                )
+            self._clients[key] = c
+            if role_arn:
+                self._client_role_arns[c] = role_arn
+        self.logger.info(
+            f"## Connected to {client_name.upper()} via client, AWS region: {region}"
+            + (f", IAM role: {role_arn}" if role_arn else "")
+        )
         return c
 
-    def get_clients_and_res_objs(self, region: str, client_names: list[str]) -> tuple[dict, dict]:
+    def get_clients_and_res_objs(
+        self,
+        region: str,
+        client_names: list[str],
+        profile: str = None,
+        json_paths_key: str = None,
+        role_arn: str = None,
+    ) -> tuple[dict, dict]:
         clients: dict = {}
         res: dict = {}
         for client_name in client_names:
-            clients[client_name] = self.get_client(region, client_name)
-            res[client_name] = {}
+            clients[client_name] = self.get_client(region, client_name, profile=profile, role_arn=role_arn)
+            res[client_name] = self.get_result_recorder(client_name, json_paths_key=json_paths_key)
         return clients, res
 
+    def get_result_recorder(self, client_name: str, json_paths_key: str = None) -> ResultRecorder:
+        return ResultRecorder(
+            self.json_paths[json_paths_key][client_name] if json_paths_key else self.json_paths[client_name],
+            strip_metadata=self.result_recorder_strip_metadata,
+            compress=self.result_recorder_compress,
+            buffer_size=self.result_recorder_buffer_size,
+            max_items=self.result_recorder_max_items,
+        )
+
     def is_deploy_env_internal(self, deploy_env: str) -> bool:
         # Handles deploy envs containing a deploy env as a sub-string (e.g. dev-unstable)
         return deploy_env in self.deploy_envs_internal or any(de in deploy_env for de in self.deploy_envs_internal)
@@ -161,66 +881,33 @@ class CommonFuncs:
             de in deploy_env for de in self.deploy_envs_non_git_tag
         )
 
-    def sns_list_topics(self, sns) -> list[dict]:
+    def sns_list_topics(self, sns) -> Iterator[dict]:
         self.logger.info("## List all SNS topics")
-        is_next_token: bool = True
-        next_token: str = None
-        sns_list_topics_res_topics: list = []
-        while is_next_token:
-            try:
-                sns_list_topics_res = sns.list_topics(
-                    **{
-                        k: v
-                        for k, v in {
-                            "NextToken": next_token if next_token else None,
-                        }.items()
-                        if v
-                    }
-                )
-                self.logger.info("## SNS List Topics successful response")
-            except ClientError as ex:
-                self.logger.error(f"## SNS List Topics ERROR: '{ex}'")
-                sys.exit(1)
-            if "NextToken" in sns_list_topics_res:
-                next_token = sns_list_topics_res["NextToken"]
-            else:
-                is_next_token = False
-            sns_list_topics_res_topics += sns_list_topics_res["Topics"]
-        return sns_list_topics_res_topics
+        return self.paginate(sns.list_topics, "Topics", "SNS List Topics")
 
-    def ssm_describe_parameters(self, ssm, contains: str = None) -> list[dict]:
+    def ssm_describe_parameters(self, ssm, contains: str = None) -> Iterator[dict]:
         self.logger.info(f"## List all SSM Parameter Store parameters{f', containing: {contains}' if contains else ''}")
-        is_next_token: bool = True
-        next_token: str = None
-        ssm_describe_parameters_res_topics: list = []
-        while is_next_token:
-            try:
-                ssm_describe_parameters_res = ssm.describe_parameters(
-                    **{
-                        k: v
-                        for k, v in {
-                            "ParameterFilters": (
-                                [{"Key": "Name", "Option": "Contains", "Values": [contains]}] if contains else None
-                            ),
-                            "NextToken": next_token if next_token else None,
-                        }.items()
-                        if v
-                    }
-                )
-                self.logger.info("## SSM Describe Parameters successful response")
-            except ClientError as ex:
-                self.logger.error(f"## SSM Describe Parameters ERROR: '{ex}'")
-                sys.exit(1)
-            if "NextToken" in ssm_describe_parameters_res:
-                next_token = ssm_describe_parameters_res["NextToken"]
-            else:
-                is_next_token = False
-            ssm_describe_parameters_res_topics += ssm_describe_parameters_res["Parameters"]
-        return ssm_describe_parameters_res_topics
+        return self.paginate(
+            ssm.describe_parameters,
+            "Parameters",
+            "SSM Describe Parameters",
+            **{
+                k: v
+                for k, v in {
+                    "ParameterFilters": (
+                        [{"Key": "Name", "Option": "Contains", "Values": [contains]}] if contains else None
+                    ),
+                }.items()
+                if v
+            },
+        )
 
     def write_to_json_paths(self, res: dict, client_names: list[str], json_paths_key: str = None):
-        for i in [
-            (self.json_paths[json_paths_key][i] if json_paths_key else self.json_paths[i], res[i]) for i in client_names
-        ]:
-            with open(i[0], "w+", encoding="utf-8") as f:
-                json.dump(i[1], f, indent=2, default=str)
+        # Responses are appended to the NDJSON files as they are recorded, so this only flushes any still buffered
+        # (any plain dict results are recorded in full first)
+        for client_name in client_names:
+            if not isinstance(recorder := res[client_name], ResultRecorder):
+                recorder = self.get_result_recorder(client_name, json_paths_key=json_paths_key)
+                for k, v in res[client_name].items():
+                    recorder[k] = v
+            recorder.flush()
@@ -56,13 +56,13 @@ def main(
     }
 
     lambda_invoke_res: dict = clients[aws.lambda_str].invoke(**invoke_args)
-    res[aws.lambda_str]["lambda_invoke"] = lambda_invoke_res
 
     if "Payload" in lambda_invoke_res:
         lambda_res_payload = lambda_invoke_res["Payload"].read()
         if isinstance(lambda_res_payload, bytes):
             lambda_res_payload = lambda_res_payload.decode(encoding="utf-8")
         lambda_invoke_res["Payload"] = lambda_res_payload
+    res[aws.lambda_str]["lambda_invoke"] = lambda_invoke_res
 
     if lambda_invoke_res["StatusCode"] == 200:
         logger.info(f"## Lambda Invoke response payload: {lambda_invoke_res['Payload']}")
@@ -137,9 +137,9 @@ main() {
 
     printf "%s\n\n" "## Running '${PY_FILE}' script"
     if [[ -z "${GIT_REPO}" ]]; then
-      python3 ${PY_FILE} --region "${REGION}" --function_name "${FUNCTION_NAME}" --payload_action "${ACTION}" --payload_db_schemas "${DB_SCHEMAS}" --payload_sql_filename "${SQL_FILENAME}"
+      python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --function_name "${FUNCTION_NAME}" --payload_action "${ACTION}" --payload_db_schemas "${DB_SCHEMAS}" --payload_sql_filename "${SQL_FILENAME}"
     else
-      python3 ${PY_FILE} --region "${REGION}" --function_name "${FUNCTION_NAME}" --payload_project_name "${GIT_REPO}" --payload_action "${ACTION}" --payload_db_schemas "${DB_SCHEMAS}" --payload_sql_filename "${SQL_FILENAME}"
+      python3 ../aws-scripts.py "${FILENAME}" --region "${REGION}" --function_name "${FUNCTION_NAME}" --payload_project_name "${GIT_REPO}" --payload_action "${ACTION}" --payload_db_schemas "${DB_SCHEMAS}" --payload_sql_filename "${SQL_FILENAME}"
     fi
     date
   fi